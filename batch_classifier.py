@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch Classifier Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: Classifies feature vectors in batches instead of one per call.
+
+Feature vectors from a window of frames, or from several hands of one frame,
+are copied into a preallocated matrix and classified with a single
+predict_proba call once the batch is full or its oldest entry has waited
+max_wait_ms. Every entry carries a caller-supplied key (frame index, hand
+index, request id ...) so results can be matched back.
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from hand_features import FEATURES_PER_HAND
+
+
+# One classified feature vector
+Prediction = namedtuple('Prediction', ['key', 'label', 'confidence', 'proba'])
+
+
+class BatchClassifier:
+    """Accumulates feature vectors and classifies them in one vectorized call
+
+    add() returns the predictions of any batch it completed (usually an
+    empty list); poll() flushes when the wait time has expired and flush()
+    classifies whatever is pending.
+    """
+
+    def __init__(self, model, max_batch_size=64, max_wait_ms=None, n_features=FEATURES_PER_HAND):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._buffer = np.empty((max_batch_size, n_features), dtype=np.float32)
+        self._keys = []
+        self._oldest = None
+        self.batches = 0
+        self.samples = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, features, key=None):
+        """Queue one feature vector, or a (rows, features) matrix with a key per row"""
+        features = np.asarray(features, dtype=np.float32)
+        if features.ndim == 1:
+            rows, keys = features[None, :], [key]
+        else:
+            rows = features
+            keys = list(key) if key is not None else [None] * len(features)
+            if len(keys) != len(rows):
+                raise ValueError(f"Got {len(keys)} keys for {len(rows)} feature rows")
+
+        completed = []
+        start = 0
+        while start < len(rows):
+            n = len(self._keys)
+            take = min(self.max_batch_size - n, len(rows) - start)
+            self._buffer[n:n + take] = rows[start:start + take]
+            self._keys.extend(keys[start:start + take])
+            if n == 0:
+                self._oldest = time.perf_counter()
+            start += take
+            if len(self._keys) == self.max_batch_size:
+                completed.extend(self.flush())
+        return completed
+
+    def due(self):
+        """True if the oldest pending entry has waited max_wait_ms"""
+        if not self._keys or self.max_wait_ms is None:
+            return False
+        return (time.perf_counter() - self._oldest) * 1000.0 >= self.max_wait_ms
+
+    def poll(self):
+        """Flush if the wait time has expired; returns the predictions (if any)"""
+        return self.flush() if self.due() else []
+
+    def flush(self):
+        """Classify all pending entries"""
+        n = len(self._keys)
+        if n == 0:
+            return []
+        proba = self.model.predict_proba(self._buffer[:n])
+        best = np.argmax(proba, axis=1)
+        labels = self.model.classes_.take(best)
+        confidences = proba[np.arange(n), best]
+        keys = self._keys
+        self._keys = []
+        self._oldest = None
+        self.batches += 1
+        self.samples += n
+        return [Prediction(keys[i], labels[i], float(confidences[i]), proba[i]) for i in range(n)]
+
+    def classify(self, features, keys=None):
+        """Classify a whole matrix in max_batch_size chunks; returns predictions in order"""
+        predictions = self.add(features, keys if keys is not None else range(len(features)))
+        predictions.extend(self.flush())
+        return predictions
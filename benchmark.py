@@ -0,0 +1,729 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Performance Benchmark Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: Camera-free benchmarks for the detection pipeline
+
+Usage:
+    python benchmark.py tracking --video clip.mp4 [--label 0]
+    python benchmark.py predict [--samples 500]
+    python benchmark.py load
+    python benchmark.py batch [--sizes 1,8,32,128]
+    python benchmark.py suite [--output results.json] [--baseline baseline.json]
+    python benchmark.py startup [--repeats 5] [--output startup.json]
+    python benchmark.py frames [--sizes 640x480,1280x720]
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import platform
+import argparse
+import tempfile
+
+import numpy as np
+
+
+def summarize(times_ms):
+    """Mean / median / p95 of a list of timings in milliseconds"""
+    if len(times_ms) == 0:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0}
+    times_ms = np.asarray(times_ms, dtype=np.float64)
+    return {
+        'mean': float(times_ms.mean()),
+        'p50': float(np.percentile(times_ms, 50)),
+        'p95': float(np.percentile(times_ms, 95)),
+    }
+
+
+def load_model(model_path='model.p'):
+    with open(model_path, 'rb') as f:
+        return pickle.load(f)['model']
+
+
+def read_video_frames(video_path, max_frames=0):
+    """Decode a clip into a list of RGB frames (decode time is not benchmarked)"""
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video {video_path}")
+    frames = []
+    while not max_frames or len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+
+def run_tracker(frames, model, mode, tracking_confidence):
+    """Run one tracker mode ('static', 'video' or 'roi') over the frames
+
+    Returns timings and per-frame labels.
+    """
+    from hand_features import HandFeatureExtractor
+    from hand_tracker import HandTracker
+
+    roi = mode == 'roi'
+    tracker = HandTracker(mode='static' if roi else mode, max_num_hands=1, min_detection_confidence=0.3,
+                          min_tracking_confidence=tracking_confidence, roi=roi)
+    extractor = HandFeatureExtractor(max_hands=1)
+    detect_ms = []
+    total_ms = []
+    predictions = []
+    for frame in frames:
+        start = time.perf_counter()
+        results = tracker.process(frame)
+        detected = time.perf_counter()
+        label = None
+        if results.multi_hand_landmarks:
+            features = extractor.extract(results.multi_hand_landmarks)
+            label = str(model.predict(features.reshape(1, -1))[0])
+        end = time.perf_counter()
+        detect_ms.append((detected - start) * 1000)
+        total_ms.append((end - start) * 1000)
+        predictions.append(label)
+    tracker.close()
+    return {
+        'detect': summarize(detect_ms),
+        'total': summarize(total_ms),
+        'detection_rate': sum(p is not None for p in predictions) / max(1, len(predictions)),
+        'lost_events': tracker.lost_events,
+        'predictions': predictions,
+    }
+
+
+def bench_tracking(args):
+    """Per-frame latency and accuracy of static, tracking and ROI detection on a clip"""
+    frames = read_video_frames(args.video, args.frames)
+    if not frames:
+        raise SystemExit(f"No frames decoded from {args.video}")
+    model = load_model(args.model)
+
+    report = {}
+    for mode in ('static', 'video', 'roi'):
+        # Warm up the graph so the first-frame initialization is not measured
+        run_tracker(frames[:1], model, mode, args.tracking_confidence)
+        report[mode] = run_tracker(frames, model, mode, args.tracking_confidence)
+
+    reference = report['static']['predictions']
+    print(f"{len(frames)} frames from {args.video}")
+    print(f"{'mode':<8}{'detect p50':>12}{'detect p95':>12}{'total mean':>12}{'hand %':>9}{'accuracy':>10}")
+    for mode, result in report.items():
+        predictions = result['predictions']
+        if args.label is not None:
+            # Ground truth: every frame of the clip shows args.label
+            correct = sum(p == args.label for p in predictions)
+        else:
+            # No ground truth: agreement with the static (per-frame detection) path
+            correct = sum(p == r for p, r in zip(predictions, reference))
+        accuracy = correct / len(predictions)
+        print(f"{mode:<8}{result['detect']['p50']:>10.2f}ms{result['detect']['p95']:>10.2f}ms"
+              f"{result['total']['mean']:>10.2f}ms{result['detection_rate'] * 100:>8.1f}%{accuracy * 100:>9.1f}%")
+    if args.label is None:
+        print("accuracy = agreement with static mode predictions (pass --label for ground truth)")
+    return report
+
+
+def time_calls(func, inputs):
+    """Per-call latencies in milliseconds"""
+    times_ms = []
+    for x in inputs:
+        start = time.perf_counter()
+        func(x)
+        times_ms.append((time.perf_counter() - start) * 1000)
+    return times_ms
+
+
+def bench_predict(args):
+    """Single-sample latency of sklearn vs. the flat forest predictor"""
+    from dataset_store import load_training_data
+    from forest_predictor import FlatForest, is_forest
+
+    model = load_model(args.model)
+    if not is_forest(model):
+        raise SystemExit(f"{args.model} does not contain a tree ensemble")
+    flat = FlatForest.from_sklearn(model)
+
+    dataset = load_training_data()
+    X = np.asarray(dataset.single_hand_features(), dtype=np.float32)
+    rng = np.random.default_rng(0)
+    X = X[rng.choice(len(X), size=min(args.samples, len(X)), replace=False)]
+
+    # Correctness: identical labels and probabilities
+    same_labels = np.array_equal(model.predict(X), flat.predict(X))
+    same_proba = np.array_equal(model.predict_proba(X), flat.predict_proba(X))
+
+    rows = [x.reshape(1, -1) for x in X]
+    flat.predict(rows[0])
+    sklearn_ms = summarize(time_calls(model.predict, rows))
+    flat_ms = summarize(time_calls(flat.predict, rows))
+    batch_ms = summarize(time_calls(flat.predict, [X] * 5))
+
+    print(f"{flat.n_estimators} trees, {len(flat.feature)} nodes, max depth {flat.max_depth}")
+    print(f"identical labels: {same_labels}, identical probabilities: {same_proba}")
+    print(f"{'predictor':<22}{'p50':>10}{'p95':>10}")
+    print(f"{'sklearn predict':<22}{sklearn_ms['p50'] * 1000:>8.0f}us{sklearn_ms['p95'] * 1000:>8.0f}us")
+    print(f"{'flat forest predict':<22}{flat_ms['p50'] * 1000:>8.0f}us{flat_ms['p95'] * 1000:>8.0f}us")
+    print(f"flat forest batch of {len(X)}: {batch_ms['p50'] * 1000 / len(X):.1f}us per sample")
+    if not (same_labels and same_proba):
+        raise SystemExit("Flat forest predictions differ from sklearn")
+    return {'sklearn': sklearn_ms, 'flat': flat_ms}
+
+
+def bench_load(args):
+    """Model load time: legacy pickle vs. memory-mapped artifact"""
+    from model_store import load_model_artifact
+
+    timings = {}
+    for name, loader in (('model.p (pickle)', lambda: load_model(args.model)),
+                         (f"{args.model_dir} (artifact)", lambda: load_model_artifact(args.model_dir))):
+        times_ms = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            loader()
+            times_ms.append((time.perf_counter() - start) * 1000)
+        timings[name] = summarize(times_ms)
+        print(f"{name:<24}{timings[name]['p50']:>10.1f}ms")
+    return timings
+
+
+def bench_batch(args):
+    """Classification throughput for different batch sizes"""
+    from batch_classifier import BatchClassifier
+    from dataset_store import load_training_data
+    from model_store import load_classifier
+
+    model = load_classifier(args.model_dir, args.model)
+    dataset = load_training_data()
+    X = np.asarray(dataset.single_hand_features(), dtype=np.float32)
+    rng = np.random.default_rng(0)
+    X = X[rng.integers(0, len(X), size=args.samples)]
+
+    reference = None
+    report = {}
+    print(f"{args.samples} samples, {type(model).__name__}")
+    print(f"{'batch size':<12}{'samples/s':>12}{'per sample':>12}{'speedup':>9}")
+    for size in [int(size) for size in args.sizes.split(',')]:
+        classifier = BatchClassifier(model, max_batch_size=size)
+        classifier.classify(X[:size])
+        times = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            predictions = classifier.classify(X)
+            times.append(time.perf_counter() - start)
+        labels = [p.label for p in predictions]
+        if reference is None:
+            reference = labels
+        elif labels != reference:
+            raise SystemExit(f"Batch size {size} changed the predictions")
+        seconds = float(np.median(times))
+        report[size] = {'samples_per_s': args.samples / seconds, 'us_per_sample': seconds / args.samples * 1e6}
+        speedup = report[size]['samples_per_s'] / next(iter(report.values()))['samples_per_s']
+        print(f"{size:<12}{report[size]['samples_per_s']:>12.0f}{report[size]['us_per_sample']:>10.1f}us"
+              f"{speedup:>8.1f}x")
+    return report
+
+
+def synthetic_frames(count, rng, size=(480, 640)):
+    """Smooth random BGR frames (deterministic for a given rng)"""
+    import cv2
+
+    frames = []
+    for _ in range(count):
+        noise = rng.integers(0, 256, size=(size[0] // 8, size[1] // 8, 3), dtype=np.uint8)
+        frames.append(cv2.resize(noise, (size[1], size[0]), interpolation=cv2.INTER_CUBIC))
+    return frames
+
+
+def synthetic_dataset(samples, rng, num_classes=36):
+    """Landmark features around one random hand shape per class"""
+    from hand_features import FEATURES_PER_HAND
+
+    shapes = rng.uniform(0.0, 0.3, size=(num_classes, FEATURES_PER_HAND))
+    labels = rng.integers(0, num_classes, size=samples)
+    features = shapes[labels] + rng.normal(scale=0.02, size=(samples, FEATURES_PER_HAND))
+    return features.astype(np.float32), labels.astype(str)
+
+
+def landmark_protos(hands):
+    """Convert random_landmarks() hands to the protobuf messages MediaPipe returns"""
+    from mediapipe.framework.formats import landmark_pb2
+
+    return [landmark_pb2.NormalizedLandmarkList(
+        landmark=[landmark_pb2.NormalizedLandmark(x=lm.x, y=lm.y, z=0.0) for lm in hand.landmark])
+        for hand in hands]
+
+
+def timed(func, items, repeats=1):
+    """Per-item latencies in ms over `repeats` passes"""
+    times_ms = []
+    for _ in range(repeats):
+        times_ms.extend(time_calls(func, items))
+    return summarize(times_ms)
+
+
+def tk_photo_factory():
+    """ImageTk.PhotoImage constructor, or None without a display"""
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+
+        root = tk.Tk()
+        root.withdraw()
+    except Exception:
+        return None
+    return lambda image: ImageTk.PhotoImage(image=image, master=root)
+
+
+def bench_stages(frames, hands, model, rng, repeats):
+    """Per-frame cost of every detection_loop / render_loop stage"""
+    import cv2
+    import mediapipe as mp
+    from PIL import Image
+    from hand_features import HandFeatureExtractor
+    from hand_tracker import HandTracker
+
+    metrics = {}
+    jpegs = [cv2.imencode('.jpg', frame)[1] for frame in frames]
+    metrics['decode'] = timed(lambda jpeg: cv2.imdecode(jpeg, cv2.IMREAD_COLOR), jpegs, repeats)
+    metrics['bgr_to_rgb'] = timed(lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), frames, repeats)
+
+    rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+    for mode in ('static', 'video'):
+        tracker = HandTracker(mode=mode, max_num_hands=1, min_detection_confidence=0.3)
+        tracker.process(rgb_frames[0])
+        metrics[f"hands_{mode}"] = timed(tracker.process, rgb_frames)
+        tracker.close()
+
+    extractor = HandFeatureExtractor(max_hands=1)
+    metrics['features'] = timed(extractor.extract, hands, repeats)
+    rows = [extractor.extract(hand).reshape(1, -1).copy() for hand in hands]
+    model.predict(rows[0])
+    metrics['predict'] = timed(model.predict, rows, repeats)
+
+    mp_drawing = mp.solutions.drawing_utils
+    spec = mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=3)
+
+    def draw(item):
+        frame, hand = item
+        frame = frame.copy()
+        mp_drawing.draw_landmarks(frame, hand[0], mp.solutions.hands.HAND_CONNECTIONS, spec, spec)
+        cv2.rectangle(frame, (100, 100), (300, 300), (0, 255, 0), 8, cv2.LINE_AA)
+        cv2.putText(frame, 'A', (100, 88), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (0, 0, 0), 5, cv2.LINE_AA)
+
+    metrics['draw'] = timed(draw, list(zip(frames, hands)), repeats)
+
+    def to_image(frame):
+        return Image.fromarray(cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), (640, 480)))
+
+    metrics['tk_convert'] = timed(to_image, frames, repeats)
+    photo = tk_photo_factory()
+    if photo is not None:
+        images = [to_image(frame) for frame in frames]
+        metrics['tk_photoimage'] = timed(photo, images, repeats)
+    else:
+        print("⚠ No display: skipping the ImageTk.PhotoImage stage")
+    return metrics
+
+
+def bench_extraction(frames):
+    """create_dataset.py per-image extraction cost (serial) on files written to a temp dir"""
+    import cv2
+    import create_dataset
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for i, frame in enumerate(frames):
+            path = os.path.join(tmp_dir, f"{i}.jpg")
+            cv2.imwrite(path, frame)
+            paths.append(path)
+        create_dataset.extract_landmarks(paths[0])
+        return timed(create_dataset.extract_landmarks, paths)
+
+
+def bench_training(sizes, rng):
+    """RandomForestClassifier fit time for increasing dataset sizes"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    metrics = {}
+    for size in sizes:
+        X, y = synthetic_dataset(size, rng)
+        start = time.perf_counter()
+        RandomForestClassifier(random_state=0, n_jobs=1).fit(X, y)
+        ms = (time.perf_counter() - start) * 1000
+        metrics[f"train_{size}"] = {'mean': ms, 'p50': ms, 'p95': ms}
+    return metrics
+
+
+def environment():
+    import cv2
+    import sklearn
+
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+def compare_results(metrics, baseline, tolerance):
+    """Metrics whose median got slower than the baseline by more than tolerance"""
+    regressions = []
+    print(f"{'metric':<18}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, current in metrics.items():
+        reference = baseline.get(name)
+        if reference is None or reference['p50'] <= 0:
+            print(f"{name:<18}{'-':>12}{current['p50']:>10.3f}ms{'new':>9}")
+            continue
+        change = current['p50'] / reference['p50'] - 1.0
+        flag = '✗' if change > tolerance else '✓'
+        print(f"{name:<18}{reference['p50']:>10.3f}ms{current['p50']:>10.3f}ms{change * 100:>+8.1f}% {flag}")
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def bench_suite(args):
+    """Camera-free end-to-end benchmark with JSON output and baseline comparison"""
+    from hand_features import random_landmarks
+    from forest_predictor import FlatForest
+    from sklearn.ensemble import RandomForestClassifier
+
+    import cv2
+
+    rng = np.random.default_rng(args.seed)
+    if args.video:
+        frames = read_video_frames(args.video, args.frames)
+        # The stages take BGR frames like the camera delivers
+        frames = [cv2.cvtColor(frame, cv2.COLOR_RGB2BGR) for frame in frames]
+    elif args.images:
+        names = sorted(f for f in os.listdir(args.images) if f.lower().endswith(('.jpg', '.jpeg', '.png')))
+        frames = [cv2.imread(os.path.join(args.images, name)) for name in names[:args.frames]]
+        frames = [frame for frame in frames if frame is not None]
+    else:
+        frames = synthetic_frames(args.frames, rng)
+    if not frames:
+        raise SystemExit("No frames to benchmark")
+    hands = [landmark_protos(random_landmarks(1, rng)) for _ in range(len(frames))]
+
+    # A fixed synthetic model keeps predict timings comparable between machines and runs
+    X, y = synthetic_dataset(2000, rng)
+    model = FlatForest.from_sklearn(RandomForestClassifier(random_state=0, n_jobs=1).fit(X, y))
+
+    print(f"Timing per-frame stages on {len(frames)} frames...")
+    metrics = bench_stages(frames, hands, model, rng, args.repeats)
+    if not args.skip_extraction:
+        print("Timing dataset extraction...")
+        metrics['extract_image'] = bench_extraction(frames)
+    if not args.skip_training:
+        print("Timing training...")
+        metrics.update(bench_training([int(size) for size in args.train_sizes.split(',')], rng))
+
+    print(f"{'metric':<18}{'p50':>12}{'p95':>12}")
+    for name, stats in metrics.items():
+        print(f"{name:<18}{stats['p50']:>10.3f}ms{stats['p95']:>10.3f}ms")
+
+    results = {'environment': environment(), 'frames': len(frames),
+               'source': args.video or args.images or 'synthetic', 'metrics': metrics}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(metrics, baseline['metrics'], args.tolerance)
+        if regressions:
+            print(f"✗ {len(regressions)} regression(s) beyond {args.tolerance * 100:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"✓ No regressions beyond {args.tolerance * 100:.0f}%")
+    return results
+
+
+def frame_paths(shape, display_size):
+    """Per-frame GUI frame path before and after the pooled capture layer
+
+    Returns {name: (process(source) -> PIL image, [(operation, bytes read,
+    bytes written)])}. The camera read is modelled as a copy of the source
+    frame (into a new array or into a pooled buffer). Both paths still copy
+    the display frame into a new PIL image every frame.
+    """
+    import cv2
+    from PIL import Image
+    from camera import mirror_to_rgb
+    from pipeline import FramePool
+
+    width, height = display_size
+    frame_bytes = int(np.prod(shape))
+    display_bytes = width * height * 3
+    resized = shape[:2] != (height, width)
+
+    def legacy(source):
+        frame = source.copy()
+        frame = cv2.flip(frame, 1)
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame = cv2.resize(frame, display_size)
+        return Image.fromarray(frame)
+
+    pool = FramePool()
+    display_buffer = np.empty((height, width, 3), dtype=np.uint8)
+
+    def pooled(source):
+        captured = pool.acquire(shape)
+        np.copyto(captured, source)
+        frame = mirror_to_rgb(captured, pool.acquire(shape))
+        pool.release(captured)
+        if resized:
+            image = Image.fromarray(cv2.resize(frame, display_size, dst=display_buffer))
+        else:
+            image = Image.fromarray(frame)
+        pool.release(frame)
+        return image
+
+    legacy_ops = [('read', 0, frame_bytes), ('flip', frame_bytes, frame_bytes),
+                  ('bgr2rgb (detect)', frame_bytes, frame_bytes), ('bgr2rgb (display)', frame_bytes, frame_bytes),
+                  ('resize', frame_bytes, display_bytes), ('to PIL', display_bytes, display_bytes)]
+    pooled_ops = [('read', 0, frame_bytes), ('flip', frame_bytes, frame_bytes),
+                  ('bgr2rgb', frame_bytes, frame_bytes)]
+    if resized:
+        pooled_ops += [('resize', frame_bytes, display_bytes), ('to PIL', display_bytes, display_bytes)]
+    else:
+        pooled_ops += [('to PIL', frame_bytes, display_bytes)]
+    return {'legacy': (legacy, legacy_ops), 'pooled': (pooled, pooled_ops)}
+
+
+def bench_frames(args):
+    """Time, memory allocation and memory traffic of the GUI frame path per camera resolution
+
+    tracemalloc sees NumPy/OpenCV arrays but not Pillow's C allocations, so
+    the PIL image is counted from its size (Pillow stores RGB as 4 bytes per
+    pixel). The Tk PhotoImage the UI thread builds from it is another
+    full-frame copy that is not measured here.
+    """
+    import tracemalloc
+
+    rng = np.random.default_rng(args.seed)
+    display_size = (640, 480)
+    print(f"{'camera':<11}{'path':<8}{'time':>10}{'arrays':>11}{'PIL':>11}{'traffic':>11}"
+          f"{'at ' + str(args.fps) + ' fps':>13}")
+    results = {}
+    for size in args.sizes.split(','):
+        width, height = (int(v) for v in size.lower().split('x'))
+        shape = (height, width, 3)
+        source = rng.integers(0, 256, size=shape, dtype=np.uint8)
+        for name, (process, ops) in frame_paths(shape, display_size).items():
+            for _ in range(3):
+                process(source)
+            times = []
+            for _ in range(args.frames):
+                start = time.perf_counter()
+                process(source)
+                times.append((time.perf_counter() - start) * 1000)
+            # Peak NumPy/OpenCV memory allocated while processing one frame
+            tracemalloc.start()
+            process(source)
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            image = process(source)
+            array_bytes = tracemalloc.get_traced_memory()[1] - before
+            tracemalloc.stop()
+            # Pillow allocates outside tracemalloc: 4 bytes per RGB pixel
+            image_bytes = image.width * image.height * 4
+            traffic = sum(read + written for _, read, written in ops)
+            stats = summarize(times)
+            results[f"{size}_{name}"] = dict(stats, alloc_bytes=array_bytes + image_bytes, array_alloc_bytes=array_bytes,
+                                            image_alloc_bytes=image_bytes, traffic_bytes=traffic,
+                                            operations=[op for op, _, _ in ops])
+            print(f"{size:<11}{name:<8}{stats['p50']:>8.2f}ms{array_bytes / 1e6:>9.2f}MB{image_bytes / 1e6:>9.2f}MB"
+                  f"{traffic / 1e6:>9.1f}MB{traffic * args.fps / 1e6:>9.0f}MB/s")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'frames': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+    return results
+
+
+# Entry scripts timed by the startup benchmark
+STARTUP_MODULES = ('sign_language_app', 'collect_imgs', 'create_dataset', 'train_classifier',
+                   'inference_classifier', 'inference_server')
+# Heavy dependencies reported when an entry script imports them eagerly
+HEAVY_MODULES = ('cv2', 'mediapipe', 'sklearn', 'matplotlib', 'PIL.ImageTk', 'pyarrow')
+
+# Run in a fresh interpreter: import one module, report time and heavy imports
+IMPORT_SNIPPET = """
+import sys, time, json
+start = time.perf_counter()
+__import__(sys.argv[1])
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({'ms': elapsed, 'loaded': [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+# Run in a fresh interpreter: time until the window is drawn and until the
+# background initializer (model, hand tracker, camera) has finished
+APP_SNIPPET = """
+import sys, time, json
+start = time.perf_counter()
+import tkinter as tk
+from sign_language_app import SignLanguageApp
+root = tk.Tk()
+app = SignLanguageApp(root)
+root.update()
+window = (time.perf_counter() - start) * 1000
+while not app.ready.wait(0.01):
+    root.update()
+ready = (time.perf_counter() - start) * 1000
+if app.cap:
+    app.cap.release()
+app.model_watcher.stop()
+root.destroy()
+print(json.dumps({'window_ms': window, 'ready_ms': ready}))
+"""
+
+
+def run_snippet(snippet, *argv):
+    """Run a snippet in a new interpreter next to the entry scripts; returns its JSON output"""
+    import subprocess
+
+    result = subprocess.run([sys.executable, '-c', snippet, *argv], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def bench_startup(args):
+    """Cold import time of every entry script and time to a usable GUI"""
+    modules = args.modules.split(',') if args.modules else STARTUP_MODULES
+    metrics = {}
+    print(f"{'module':<22}{'p50':>10}{'p95':>10}  heavy imports")
+    for module in modules:
+        times = []
+        for _ in range(args.repeats):
+            result = run_snippet(IMPORT_SNIPPET, module, *HEAVY_MODULES)
+            times.append(result['ms'])
+        stats = metrics[f"import_{module}"] = summarize(times)
+        print(f"{module:<22}{stats['p50']:>8.0f}ms{stats['p95']:>8.0f}ms  {', '.join(result['loaded']) or '-'}")
+
+    if not args.skip_gui:
+        window, ready = [], []
+        try:
+            for _ in range(args.repeats):
+                result = run_snippet(APP_SNIPPET)
+                window.append(result['window_ms'])
+                ready.append(result['ready_ms'])
+        except RuntimeError as e:
+            print(f"⚠ GUI startup not measured: {e}")
+        else:
+            metrics['app_window'] = summarize(window)
+            metrics['app_ready'] = summarize(ready)
+            print(f"{'GUI window shown':<22}{metrics['app_window']['p50']:>8.0f}ms{metrics['app_window']['p95']:>8.0f}ms")
+            print(f"{'GUI ready':<22}{metrics['app_ready']['p50']:>8.0f}ms{metrics['app_ready']['p95']:>8.0f}ms")
+
+    results = {'environment': environment(), 'metrics': metrics}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(metrics, baseline['metrics'], args.tolerance)
+        if regressions:
+            print(f"✗ {len(regressions)} regression(s) beyond {args.tolerance * 100:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"✓ No regressions beyond {args.tolerance * 100:.0f}%")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sign language detector benchmarks")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    tracking = subparsers.add_parser('tracking', help="Static vs. tracking vs. ROI hand detection on a recorded clip")
+    tracking.add_argument('--video', required=True, help="Recorded clip to replay")
+    tracking.add_argument('--label', default=None,
+                          help="Class shown throughout the clip (e.g. '0' for A); enables accuracy against ground truth")
+    tracking.add_argument('--frames', type=int, default=0, help="Limit the number of frames (0 = all)")
+    tracking.add_argument('--tracking-confidence', type=float, default=0.5)
+    tracking.add_argument('--model', default='model.p')
+    tracking.set_defaults(func=bench_tracking)
+
+    predict = subparsers.add_parser('predict', help="Per-sample latency of sklearn vs. flat forest prediction")
+    predict.add_argument('--samples', type=int, default=500, help="Dataset samples to time")
+    predict.add_argument('--model', default='model.p')
+    predict.set_defaults(func=bench_predict)
+
+    load = subparsers.add_parser('load', help="Model load time: pickle vs. memory-mapped artifact")
+    load.add_argument('--model', default='model.p')
+    load.add_argument('--model-dir', default='model')
+    load.add_argument('--repeats', type=int, default=5)
+    load.set_defaults(func=bench_load)
+
+    batch = subparsers.add_parser('batch', help="Classification throughput for different batch sizes")
+    batch.add_argument('--sizes', default='1,4,16,64,256', help="Comma-separated batch sizes")
+    batch.add_argument('--samples', type=int, default=2048, help="Feature vectors classified per run")
+    batch.add_argument('--repeats', type=int, default=3)
+    batch.add_argument('--model', default='model.p')
+    batch.add_argument('--model-dir', default='model')
+    batch.set_defaults(func=bench_batch)
+
+    suite = subparsers.add_parser('suite', help="End-to-end stage, extraction and training benchmarks")
+    suite.add_argument('--video', default=None, help="Recorded clip to use instead of synthetic frames")
+    suite.add_argument('--images', default=None, help="Folder of images to use instead of synthetic frames")
+    suite.add_argument('--frames', type=int, default=60, help="Frames per stage")
+    suite.add_argument('--repeats', type=int, default=3, help="Passes over the frames for the cheap stages")
+    suite.add_argument('--train-sizes', default='500,1000,2000,4000', help="Dataset sizes for training time")
+    suite.add_argument('--skip-extraction', action='store_true')
+    suite.add_argument('--skip-training', action='store_true')
+    suite.add_argument('--seed', type=int, default=0)
+    suite.add_argument('--output', default=None, help="Write results as JSON")
+    suite.add_argument('--baseline', default=None, help="Compare against a previous --output file")
+    suite.add_argument('--tolerance', type=float, default=0.2,
+                       help="Allowed slowdown of a metric's median before it is flagged (0.2 = 20%%)")
+    suite.set_defaults(func=bench_suite)
+
+    frames = subparsers.add_parser('frames', help="Per-frame allocation and memory traffic of the GUI frame path")
+    frames.add_argument('--sizes', default='640x480,1280x720,1920x1080', help="Camera resolutions to compare")
+    frames.add_argument('--frames', type=int, default=200, help="Frames timed per path")
+    frames.add_argument('--fps', type=int, default=30, help="Camera frame rate for the bandwidth column")
+    frames.add_argument('--seed', type=int, default=0)
+    frames.add_argument('--output', default=None, help="Write results as JSON")
+    frames.set_defaults(func=bench_frames)
+
+    startup = subparsers.add_parser('startup', help="Cold import time of the entry scripts and GUI startup time")
+    startup.add_argument('--modules', default=None,
+                         help="Comma-separated modules to import (default: all entry scripts)")
+    startup.add_argument('--repeats', type=int, default=5, help="Fresh interpreters per measurement")
+    startup.add_argument('--skip-gui', action='store_true', help="Only time the imports (no display needed)")
+    startup.add_argument('--output', default=None, help="Write results as JSON")
+    startup.add_argument('--baseline', default=None, help="Compare against a previous --output file")
+    startup.add_argument('--tolerance', type=float, default=0.2,
+                         help="Allowed slowdown of a metric's median before it is flagged (0.2 = 20%%)")
+    startup.set_defaults(func=bench_startup)
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
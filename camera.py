@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Camera Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: Camera capture with negotiated format and a pooled frame path.
+
+Cameras default to whatever mode their driver prefers, often 720p or more
+in uncompressed YUYV at a reduced frame rate. open_camera() asks for the
+resolution, frame rate and pixel format the pipeline actually uses
+(FOURCC first, since some backends only accept a size in the matching
+format) and keeps the driver's frame queue short so read() returns a fresh
+frame. The driver may ignore any of the requests; capture_settings() reports
+what was really negotiated.
+
+The frame path writes into caller-owned buffers: read() fills a pooled
+buffer and mirror_to_rgb() flips and converts it in a single destination
+buffer. The frame is converted to RGB once and is drawn on and displayed in
+RGB; only the display copies (PIL image and Tk PhotoImage) are allocated
+per frame.
+"""
+
+import cv2
+
+
+CAPTURE_WIDTH = 640
+CAPTURE_HEIGHT = 480
+CAPTURE_FPS = 30
+# Motion JPEG fits 640x480@30 into USB 2.0 bandwidth on most webcams
+CAPTURE_FOURCC = 'MJPG'
+# Frames queued in the driver; 1 keeps latency low
+CAPTURE_BUFFER_SIZE = 1
+
+
+def fourcc_name(value):
+    """CAP_PROP_FOURCC value -> four-character code ('' if unknown)"""
+    value = int(value)
+    if value <= 0:
+        return ''
+    return ''.join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def open_camera(source=0, width=CAPTURE_WIDTH, height=CAPTURE_HEIGHT, fps=CAPTURE_FPS, fourcc=CAPTURE_FOURCC,
+                buffer_size=CAPTURE_BUFFER_SIZE):
+    """Open a camera and request a capture mode; pass None to keep the driver default of a property
+
+    The caller checks isOpened() and releases the capture as with
+    cv2.VideoCapture.
+    """
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        return cap
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    if width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    if height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return cap
+
+
+def capture_settings(cap):
+    """The mode the driver actually negotiated"""
+    return {
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'fps': cap.get(cv2.CAP_PROP_FPS),
+        'fourcc': fourcc_name(cap.get(cv2.CAP_PROP_FOURCC)),
+    }
+
+
+def describe_settings(settings):
+    return (f"{settings['width']}x{settings['height']} @ {settings['fps']:.0f} fps"
+            f"{', ' + settings['fourcc'] if settings['fourcc'] else ''}")
+
+
+def mirror_to_rgb(frame, out):
+    """Mirror a BGR camera frame into `out` as RGB (two passes, no allocation)"""
+    cv2.flip(frame, 1, dst=out)
+    cv2.cvtColor(out, cv2.COLOR_BGR2RGB, dst=out)
+    return out
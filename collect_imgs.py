@@ -11,18 +11,183 @@ Description: Collects training images for sign language detection with interacti
 import os
 import cv2
 import time
+import queue
+import argparse
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from camera import open_camera
+
 
 # Configuration
 DATA_DIR = './data'
 dataset_size = 40  # Images per class
+CAPTURE_FPS = 10  # Frames saved per second while collecting
+MIN_FRAME_DIFF = 0.0  # Minimum mean pixel difference to the last saved frame (0 = off)
+WRITER_THREADS = 2  # Threads encoding and saving images
+WRITE_QUEUE_SIZE = 16  # Frames waiting to be written before new ones are dropped
+THUMBNAIL_WIDTH = 160  # Width of audit thumbnails in --landmarks mode
 
 # Global variables to store the selected collection mode and specific letter
 selected_collection_mode = None
 selected_letter = None
 
+class AsyncImageWriter:
+    """Encodes and saves frames on a small thread pool
+
+    The capture loop only enqueues frames. The queue is bounded: when the
+    writers fall behind, submit() drops the frame (counted in `dropped`)
+    instead of stalling the camera.
+    """
+
+    def __init__(self, workers=WRITER_THREADS, max_queue=WRITE_QUEUE_SIZE, jpeg_quality=95):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, path, frame):
+        """Queue a frame for saving; returns False if it was dropped"""
+        try:
+            self.queue.put_nowait((path, frame))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            path, frame = item
+            # imwrite releases the GIL, so the writers encode in parallel
+            ok = cv2.imwrite(path, frame, self.params)
+            with self._lock:
+                if ok:
+                    self.written += 1
+                else:
+                    self.failed += 1
+
+    def close(self):
+        """Write everything still queued and stop the threads"""
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+class FrameSelector:
+    """Decides which camera frames are worth saving
+
+    Frames are accepted at most `fps` times per second and, if min_diff is
+    set, only when they differ enough from the last accepted frame (mean
+    absolute difference of small grayscale thumbnails, 0-255), so holding
+    still does not fill a class with near-identical images.
+    """
+
+    def __init__(self, fps=CAPTURE_FPS, min_diff=MIN_FRAME_DIFF, size=(64, 48)):
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.min_diff = min_diff
+        self.size = size
+        self.too_similar = 0
+        self._last_time = None
+        self._last_small = None
+
+    def accept(self, frame, now=None):
+        if now is None:
+            now = time.perf_counter()
+        if self._last_time is not None and now - self._last_time < self.interval:
+            return False
+        small = None
+        if self.min_diff > 0:
+            small = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), self.size, interpolation=cv2.INTER_AREA)
+            if self._last_small is not None and cv2.absdiff(small, self._last_small).mean() < self.min_diff:
+                self.too_similar += 1
+                return False
+        self._last_time = now
+        self._last_small = small
+        return True
+
+
+class LandmarkRecorder:
+    """Live hand detection that appends feature vectors to the dataset store
+
+    Used by --landmarks: frames without a hand are discarded and each
+    accepted frame becomes one dataset sample, so no JPEGs and no second
+    extraction pass are needed. Detection uses create_dataset.py's static
+    image detector with the same settings; the only difference to extracting
+    a saved image is that the frame skips JPEG compression. Samples are checkpointed after
+    every class; an interrupted session resumes from the last checkpoint.
+    """
+
+    def __init__(self, dataset_dir, thumbnail_dir=None, image_writer=None):
+        import mediapipe as mp
+        from create_dataset import create_hands
+        from dataset_store import ChunkedDatasetWriter, META_FILE, load_dataset
+        from hand_features import HandFeatureExtractor
+
+        self.mp_hands = mp.solutions.hands
+        self.mp_drawing = mp.solutions.drawing_utils
+        # Same detector as the image-based dataset, so live and image-derived
+        # samples merged by load_training_data go through one detection path
+        self.tracker = create_hands()
+        self.extractor = HandFeatureExtractor()
+        self.thumbnail_dir = thumbnail_dir
+        self.image_writer = image_writer
+        self.session = time.strftime('%Y%m%d-%H%M%S')
+        self.no_hand = 0
+
+        self.writer = ChunkedDatasetWriter(dataset_dir, chunk_size=1024, source_id='live-collection')
+        self.samples = self.writer.open(resume=True)
+        if self.samples:
+            print(f"Resuming interrupted landmark collection ({self.samples} samples)")
+        elif os.path.exists(os.path.join(dataset_dir, META_FILE)):
+            # New samples are appended to what earlier sessions collected
+            existing = load_dataset(dataset_dir, mmap=False)
+            self.writer.append_dataset(existing)
+            self.samples = len(existing)
+            self.writer.flush(self.samples)
+
+    def detect(self, frame):
+        """Hand landmarks of a BGR frame (None if there is no hand)"""
+        results = self.tracker.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if not results.multi_hand_landmarks:
+            self.no_hand += 1
+            return None
+        return results.multi_hand_landmarks
+
+    def draw(self, frame, multi_hand_landmarks):
+        for hand_landmarks in multi_hand_landmarks:
+            self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+
+    def record(self, frame, multi_hand_landmarks, label):
+        """Append one sample; keeps a small thumbnail when thumbnail_dir is set"""
+        path = f"live/{self.session}/{label}/{self.samples}"
+        if self.thumbnail_dir and self.image_writer is not None:
+            class_dir = os.path.join(self.thumbnail_dir, label)
+            os.makedirs(class_dir, exist_ok=True)
+            path = os.path.join(class_dir, f"{self.session}_{self.samples}.jpg")
+            height = max(1, frame.shape[0] * THUMBNAIL_WIDTH // frame.shape[1])
+            self.image_writer.submit(path, cv2.resize(frame, (THUMBNAIL_WIDTH, height), interpolation=cv2.INTER_AREA))
+        self.writer.append(self.extractor.extract(multi_hand_landmarks), label, path)
+        self.samples += 1
+
+    def checkpoint(self):
+        self.writer.flush(self.samples)
+
+    def close(self):
+        """Write the dataset; returns its sample count"""
+        self.tracker.close()
+        return self.writer.finalize()
+
+
 def show_collection_options():
     """Displays a Tkinter window for the user to select collection mode."""
     global selected_collection_mode, selected_letter
@@ -174,10 +339,29 @@ def show_collection_options():
 
     root.mainloop()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Collect training images for sign language detection")
+    parser.add_argument('--fps', type=float, default=CAPTURE_FPS, help="Images saved per second while collecting")
+    parser.add_argument('--min-diff', type=float, default=MIN_FRAME_DIFF,
+                        help="Skip frames whose mean pixel difference to the last saved one is below this (0-255)")
+    parser.add_argument('--writers', type=int, default=WRITER_THREADS, help="Image writer threads")
+    parser.add_argument('--queue-size', type=int, default=WRITE_QUEUE_SIZE,
+                        help="Frames buffered for writing before new frames are dropped")
+    parser.add_argument('--landmarks', action='store_true',
+                        help="Detect hands live and store landmark features instead of images")
+    parser.add_argument('--landmark-dir', default=None,
+                        help="Dataset directory for --landmarks (default: ./landmark_dataset)")
+    parser.add_argument('--thumbnails', default=None,
+                        help="With --landmarks, also save small JPEG thumbnails here for auditing")
+    return parser.parse_args()
+
+
 def main():
     """Main data collection function"""
     global selected_collection_mode, selected_letter
     
+    args = parse_args()
+    
     # Show selection menu
     show_collection_options()
 
@@ -216,11 +400,17 @@ def main():
             os.makedirs(class_dir)
 
     # Initialize camera
-    cap = cv2.VideoCapture(0)
+    cap = open_camera(0)
     if not cap.isOpened():
         print("Error: Could not open video stream. Check camera connection.")
         return
 
+    writer = AsyncImageWriter(workers=args.writers, max_queue=args.queue_size)
+    recorder = None
+    if args.landmarks:
+        from dataset_store import LIVE_DATASET_DIR
+        recorder = LandmarkRecorder(args.landmark_dir or LIVE_DATASET_DIR, args.thumbnails, writer)
+
     print(f"\nStarting data collection for {end_class - start_class} classes...")
     print("Press 'Q' when ready to start collecting for each symbol")
     print("Press 'ESC' to exit at any time\n")
@@ -258,36 +448,61 @@ def main():
                 break
             elif key == 27:  # ESC key
                 print("Collection cancelled by user.")
+                if recorder is not None:
+                    print(f"Landmark dataset now has {recorder.close()} samples")
+                writer.close()
                 cap.release()
                 cv2.destroyAllWindows()
                 return
 
-        # Collect images
+        # Collect images: the loop only grabs frames, encoding and saving
+        # happen on the writer threads
         counter = 0
+        selector = FrameSelector(fps=args.fps, min_diff=args.min_diff)
+        dropped_before = writer.dropped
+        start = time.perf_counter()
         while counter < dataset_size:
             ret, frame = cap.read()
             if not ret:
                 print("Failed to grab frame.")
                 break
 
-            # Save image with timestamp
-            img_path = os.path.join(DATA_DIR, str(j), f'{counter}.jpg')
-            cv2.imwrite(img_path, frame)
+            if recorder is not None:
+                # Frames without a hand are discarded
+                multi_hand_landmarks = recorder.detect(frame)
+                if multi_hand_landmarks:
+                    if selector.accept(frame):
+                        recorder.record(frame, multi_hand_landmarks, str(j))
+                        counter += 1
+                    recorder.draw(frame, multi_hand_landmarks)
+            elif selector.accept(frame):
+                img_path = os.path.join(DATA_DIR, str(j), f'{counter}.jpg')
+                # The writer owns the frame from here on; annotate a copy
+                if writer.submit(img_path, frame):
+                    counter += 1
+                frame = frame.copy()
 
             # Display progress
             remaining = dataset_size - counter
             cv2.putText(frame, f'Collecting {symbol_type} "{symbol}"', (50, 50), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2, cv2.LINE_AA)
-            cv2.putText(frame, f'Progress: {counter+1}/{dataset_size} ({remaining} left)', (50, 100), 
+            cv2.putText(frame, f'Progress: {counter}/{dataset_size} ({remaining} left)', (50, 100), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2, cv2.LINE_AA)
             
             cv2.imshow('frame', frame)
-            cv2.waitKey(2)  # Small delay
-
-            counter += 1
-
-        print(f'✅ Done collecting for {symbol_type} "{symbol}" (class {j})')
-
+            cv2.waitKey(1)
+
+        elapsed = time.perf_counter() - start
+        if recorder is not None:
+            recorder.checkpoint()
+        print(f'✅ Done collecting for {symbol_type} "{symbol}" (class {j}): {counter} frames in {elapsed:.1f}s, '
+              f'{writer.dropped - dropped_before} dropped (writer busy), {selector.too_similar} skipped (too similar)')
+
+    if recorder is not None:
+        num_samples = recorder.close()
+        print(f"Landmark dataset now has {num_samples} samples ({recorder.no_hand} frames without a hand discarded)")
+    writer.close()
+    print(f"Saved {writer.written} images ({writer.failed} failed, {writer.dropped} dropped by backpressure)")
     cap.release()
     cv2.destroyAllWindows()
     
@@ -298,7 +513,10 @@ def main():
         print(f"\n🎉 Data collection complete! Collected {end_class - start_class} classes.")
     
     print("\nNext steps:")
-    print("1. Run: python create_real_dataset.py")
+    if recorder is not None:
+        print("1. (Landmarks are already in the dataset, create_dataset.py is only needed for images)")
+    else:
+        print("1. Run: python create_dataset.py")
     print("2. Run: python train_classifier.py")
     print("3. Run: python sign_language_app.py")
 
@@ -9,55 +9,311 @@ Description: Processes collected images and creates training dataset
 """
 
 import os
-import pickle
+import sqlite3
+import hashlib
+import argparse
+import itertools
+import multiprocessing
 
 import mediapipe as mp
 import cv2
-import matplotlib.pyplot as plt
+import numpy as np
 
+from hand_features import HandFeatureExtractor, FEATURE_VERSION
+from dataset_store import DATASET_DIR, ChunkedDatasetWriter
 
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
 
-hands = mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.3, min_tracking_confidence=0.3)
+mp_hands = mp.solutions.hands
 
 DATA_DIR = './data'
+OUTPUT_DIR = DATASET_DIR
+CACHE_FILE = 'landmark_cache.sqlite'
+# Bump when the extraction settings or feature layout change so stale
+# cache entries are discarded
+CACHE_VERSION = 4
+# Paths per SQLite query (stays below the bound-parameter limit)
+CACHE_BATCH = 500
+# Images processed between checkpoints
+FLUSH_EVERY = 2000
+
+# Shared feature extractor; its buffers are reused for every image
+extractor = HandFeatureExtractor()
+
+# Hands instance owned by the current process (main process in serial mode,
+# one per worker in parallel mode)
+hands = None
+
+
+def create_hands():
+    """Create the MediaPipe Hands instance used for dataset extraction"""
+    return mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.3, min_tracking_confidence=0.3)
+
+
+def init_worker():
+    """Process pool initializer: build one Hands instance per worker"""
+    global hands
+    hands = create_hands()
+
+
+def iter_images(data_dir=DATA_DIR):
+    """Yield (image_path, label) pairs in a deterministic order"""
+    for dir_ in sorted(os.listdir(data_dir)):
+        # Skip non-directory files like .gitignore
+        if not os.path.isdir(os.path.join(data_dir, dir_)):
+            continue
+        for img_path in sorted(os.listdir(os.path.join(data_dir, dir_))):
+            yield os.path.join(data_dir, dir_, img_path), dir_
+
+
+def listing_id(data_dir=DATA_DIR):
+    """Fingerprint of the input images; a checkpoint is only valid for the same input"""
+    digest = hashlib.sha1()
+    count = 0
+    for path, label in iter_images(data_dir):
+        size, mtime_ns = file_signature(path)
+        digest.update(f"{path}\0{label}\0{size}\0{mtime_ns}\n".encode('utf-8'))
+        count += 1
+    return digest.hexdigest(), count
+
+
+def extract_landmarks(img_path):
+    """Run MediaPipe on one image and return its feature vector (None if no hand)"""
+    global hands
+    if hands is None:
+        hands = create_hands()
+
+    img = cv2.imread(img_path)
+    if img is None:
+        return None
+    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+    results = hands.process(img_rgb)
+    if not results.multi_hand_landmarks:
+        return None
+
+    # Copy out of the extractor's reusable buffer
+    return extractor.extract(results.multi_hand_landmarks).copy()
+
+
+def default_chunksize(n_items, workers):
+    """Split the work into roughly four chunks per worker"""
+    return max(1, n_items // (workers * 4))
+
+
+def extract_all(paths, pool=None, workers=1, chunksize=None):
+    """Extract features for every path, preserving input order
+
+    With a process pool the images are distributed over the workers in
+    chunks; imap keeps results in submission order so the output is
+    identical to the serial path.
+    """
+    if pool is None or len(paths) < 2:
+        return [extract_landmarks(path) for path in paths]
+
+    if chunksize is None:
+        chunksize = default_chunksize(len(paths), workers)
+    return list(pool.imap(extract_landmarks, paths, chunksize=chunksize))
+
+
+def batched(iterable, size):
+    """Yield lists of up to `size` consecutive items"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def file_signature(path):
+    """Cheap change detector for an image file: (size, mtime in ns)"""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class LandmarkCache:
+    """Per-image landmark cache in SQLite, read and written one window at a time
+
+    Rows map path -> (size, mtime_ns, features), with features NULL for
+    images where no hand was found so those are not re-processed either.
+    Entries are looked up and stored per window instead of loading and
+    rewriting the whole cache, so memory and I/O per checkpoint do not grow
+    with the dataset. Every row touched by the current build is tagged with
+    its run id; rows of images that no longer exist are deleted at the end.
+    """
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        try:
+            self._open()
+        except sqlite3.DatabaseError as e:
+            print(f"Ignoring unreadable landmark cache: {e}")
+            os.remove(cache_file)
+            self._open()
+        self.run = os.urandom(8).hex()
+
+    def _open(self):
+        self.conn = sqlite3.connect(self.cache_file)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS entries "
+                          "(path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, features BLOB, run TEXT)")
+        version = f"{CACHE_VERSION}:{FEATURE_VERSION}"
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != version:
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+        self.conn.commit()
+
+    def lookup(self, paths):
+        """{path: (size, mtime_ns, features)} for the given paths that have an entry"""
+        found = {}
+        for batch in batched(paths, CACHE_BATCH):
+            query = f"SELECT path, size, mtime_ns, features FROM entries WHERE path IN ({','.join('?' * len(batch))})"
+            for path, size, mtime_ns, blob in self.conn.execute(query, batch):
+                features = np.frombuffer(blob, dtype=np.float32) if blob is not None else None
+                found[path] = (size, mtime_ns, features)
+        return found
+
+    def store(self, rows):
+        """Insert or replace (path, size, mtime_ns, features) rows for this run"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            ((path, size, mtime_ns, None if features is None else np.asarray(features, np.float32).tobytes(),
+              self.run) for path, size, mtime_ns, features in rows))
+
+    def mark(self, paths):
+        """Keep the entries of images processed before an interruption"""
+        self.conn.executemany("UPDATE entries SET run = ? WHERE path = ?", ((self.run, path) for path in paths))
+
+    def commit(self):
+        self.conn.commit()
+
+    def remove_unseen(self):
+        """Delete entries of images not seen in this run; returns how many"""
+        removed = self.conn.execute("DELETE FROM entries WHERE run IS NOT ?", (self.run,)).rowcount
+        self.conn.commit()
+        return removed
+
+    def close(self):
+        self.conn.close()
+
+
+def extract_windows(items, window_size, pool=None, workers=1, chunksize=None, cache=None, stats=None):
+    """Streaming extraction: yield lists of (path, label, features) per window
+
+    Only one window of items is decoded and held in memory at a time. With a
+    LandmarkCache, unchanged images are served from it and the entries of
+    the window are written back (committed by the caller at the checkpoint).
+    """
+    for window in batched(items, window_size):
+        paths = [path for path, _ in window]
+        signatures = [file_signature(path) for path in paths] if cache is not None else None
+        cached = cache.lookup(paths) if cache is not None else {}
+
+        features = [None] * len(paths)
+        pending = []
+        for i, path in enumerate(paths):
+            entry = cached.get(path)
+            if entry is not None and entry[:2] == signatures[i]:
+                features[i] = entry[2]
+            else:
+                pending.append(i)
+
+        extracted = extract_all([paths[i] for i in pending], pool=pool, workers=workers, chunksize=chunksize)
+        for i, data_aux in zip(pending, extracted):
+            features[i] = data_aux
+
+        if cache is not None:
+            cache.store((path, signature[0], signature[1], data_aux)
+                        for path, signature, data_aux in zip(paths, signatures, features))
+        if stats is not None:
+            stats['reused'] += len(paths) - len(pending)
+            stats['extracted'] += len(pending)
+
+        yield [(path, label, data_aux) for (path, label), data_aux in zip(window, features)]
+
+
+def create_dataset(data_dir=DATA_DIR, output_dir=OUTPUT_DIR, workers=1, chunksize=None, cache_file=CACHE_FILE,
+                   flush_every=FLUSH_EVERY, resume=True):
+    """Build the training dataset from the collected images
+
+    Images stream through list -> decode -> detect -> featurize -> chunked
+    writer. Every `flush_every` images the written samples and the landmark
+    cache are persisted together with a checkpoint, so an interrupted build
+    resumes where it stopped and memory use does not grow with the dataset.
+    """
+    source_id, total = listing_id(data_dir)
+    writer = ChunkedDatasetWriter(output_dir, source_id=source_id)
+    skip = writer.open(resume=resume)
+    if skip:
+        print(f"Resuming from checkpoint: {skip}/{total} images already processed")
+
+    cache = LandmarkCache(cache_file) if cache_file else None
+    stats = {'reused': 0, 'extracted': 0}
+
+    items = iter_images(data_dir)
+    for batch in batched(itertools.islice(items, skip), CACHE_BATCH):
+        # Images handled before the interruption keep their cache entries
+        if cache is not None:
+            cache.mark([path for path, _ in batch])
+
+    pool = None
+    workers = min(workers, max(1, total - skip))
+    if workers > 1:
+        pool = multiprocessing.Pool(processes=workers, initializer=init_worker)
+    try:
+        consumed = skip
+        for window in extract_windows(items, flush_every, pool=pool, workers=workers, chunksize=chunksize,
+                                      cache=cache, stats=stats):
+            for path, label, data_aux in window:
+                if data_aux is not None:
+                    writer.append(data_aux, label, path)
+            consumed += len(window)
+            if cache is not None:
+                cache.commit()
+            writer.flush(consumed)
+            print(f"Processed {consumed}/{total} images")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if cache is not None:
+        removed = cache.remove_unseen()
+        cache.close()
+        print(f"Landmark cache: {stats['reused']} reused, {stats['extracted']} extracted, {removed} removed")
+
+    num_samples = writer.finalize()
+    print(f"Processed {total} images, {num_samples} samples with hands detected")
+    return num_samples
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Create the training dataset from collected images")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory with one sub-folder per class")
+    parser.add_argument('--output', default=OUTPUT_DIR, help="Output dataset directory")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Number of extraction processes (1 = serial)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Images handed to a worker at a time (default: automatic)")
+    parser.add_argument('--cache-file', default=CACHE_FILE,
+                        help="Per-image landmark cache; only new or changed images are processed")
+    parser.add_argument('--no-cache', action='store_true', help="Re-process every image")
+    parser.add_argument('--flush-every', type=int, default=FLUSH_EVERY,
+                        help="Images processed between checkpoints")
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore any checkpoint left by an interrupted build")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cache_file = None if args.no_cache else args.cache_file
+    create_dataset(args.data_dir, args.output, workers=args.workers, chunksize=args.chunksize,
+                   cache_file=cache_file, flush_every=args.flush_every, resume=not args.restart)
+
 
-data = []
-labels = []
-for dir_ in os.listdir(DATA_DIR):
-    # Skip non-directory files like .gitignore
-    if not os.path.isdir(os.path.join(DATA_DIR, dir_)):
-        continue
-    for img_path in os.listdir(os.path.join(DATA_DIR, dir_)):
-        data_aux = []
-
-        x_ = []
-        y_ = []
-
-        img = cv2.imread(os.path.join(DATA_DIR, dir_, img_path))
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-        results = hands.process(img_rgb)
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                for i in range(len(hand_landmarks.landmark)):
-                    x = hand_landmarks.landmark[i].x
-                    y = hand_landmarks.landmark[i].y
-
-                    x_.append(x)
-                    y_.append(y)
-
-                for i in range(len(hand_landmarks.landmark)):
-                    x = hand_landmarks.landmark[i].x
-                    y = hand_landmarks.landmark[i].y
-                    data_aux.append(x - min(x_))
-                    data_aux.append(y - min(y_))
-
-            data.append(data_aux)
-            labels.append(dir_)
-
-f = open('data.pickle', 'wb')
-pickle.dump({'data': data, 'labels': labels}, f)
-f.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dataset Store Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: Dense, memory-mappable training dataset format.
+
+A dataset is a directory holding one .npy file per column plus a small JSON
+header:
+
+    dataset/
+        meta.json         schema name/version, feature version, label names
+        features.npy      float32 (N, MAX_HANDS * 42), zero padded per hand
+        labels.npy        int16   (N,) index into meta["label_names"]
+        hand_counts.npy   uint8   (N,) number of hands in the sample
+        paths.npy         unicode (N,) source image of the sample
+
+Plain .npy files (rather than .npz) can be opened with mmap_mode='r', so
+loading is zero-copy and only the pages actually touched are read.
+
+create_dataset.py rebuilds ./dataset from the images in ./data. Samples
+recorded live by collect_imgs.py --landmarks go to ./landmark_dataset in
+the same format; load_training_data() combines both.
+"""
+
+import os
+import glob
+import json
+import hashlib
+import pickle
+import shutil
+
+import numpy as np
+
+from hand_features import FEATURES_PER_HAND, FEATURE_VERSION
+
+
+DATASET_DIR = './dataset'
+LIVE_DATASET_DIR = './landmark_dataset'
+LEGACY_PICKLE = './data.pickle'
+
+SCHEMA_NAME = 'sign-language-dataset'
+SCHEMA_VERSION = 1
+MAX_HANDS = 2
+FEATURE_DIM = MAX_HANDS * FEATURES_PER_HAND
+
+META_FILE = 'meta.json'
+COLUMNS = {
+    'features': np.float32,
+    'labels': np.int16,
+    'hand_counts': np.uint8,
+    'paths': np.str_,
+}
+
+
+class Dataset:
+    """Column arrays of a loaded dataset plus its header"""
+
+    def __init__(self, features, labels, hand_counts, paths, label_names, meta=None):
+        self.features = features
+        self.labels = labels
+        self.hand_counts = hand_counts
+        self.paths = paths
+        self.label_names = list(label_names)
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def label_strings(self):
+        """Labels as the original class names (e.g. '0'..'35')"""
+        return np.asarray(self.label_names)[np.asarray(self.labels)]
+
+    def single_hand_features(self):
+        """Feature matrix restricted to the first hand (the model input)"""
+        return self.features[:, :FEATURES_PER_HAND]
+
+
+def dataset_hash(dataset, rows_per_block=65536):
+    """SHA-1 over label names, features and labels (streamed in row blocks)"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps(dataset.label_names).encode('utf-8'))
+    for start in range(0, len(dataset), rows_per_block):
+        end = start + rows_per_block
+        digest.update(np.ascontiguousarray(dataset.features[start:end], dtype=np.float32).tobytes())
+        digest.update(np.ascontiguousarray(dataset.labels[start:end], dtype=np.int16).tobytes())
+    return digest.hexdigest()
+
+
+def sort_label_names(names):
+    """Order class names numerically when they are digits ('2' before '10')"""
+    return sorted(set(names), key=lambda name: (not name.isdigit(), int(name) if name.isdigit() else 0, name))
+
+
+def pack_features(samples, out=None):
+    """Pack ragged per-sample feature lists into a zero padded float32 matrix
+
+    Returns (features, hand_counts). Samples with more than MAX_HANDS hands
+    are truncated.
+    """
+    if out is None:
+        out = np.zeros((len(samples), FEATURE_DIM), dtype=np.float32)
+    hand_counts = np.zeros(len(samples), dtype=np.uint8)
+    for i, sample in enumerate(samples):
+        row = np.asarray(sample, dtype=np.float32)[:FEATURE_DIM]
+        out[i, :len(row)] = row
+        out[i, len(row):] = 0
+        hand_counts[i] = len(row) // FEATURES_PER_HAND
+    return out, hand_counts
+
+
+def make_meta(num_samples, label_names):
+    return {
+        'schema': SCHEMA_NAME,
+        'version': SCHEMA_VERSION,
+        'feature_version': FEATURE_VERSION,
+        'num_samples': int(num_samples),
+        'feature_dim': FEATURE_DIM,
+        'features_per_hand': FEATURES_PER_HAND,
+        'max_hands': MAX_HANDS,
+        'label_names': list(label_names),
+    }
+
+
+def write_meta(dataset_dir, meta):
+    """Write the header last and atomically: its presence marks a complete dataset"""
+    tmp_file = os.path.join(dataset_dir, META_FILE + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_file, os.path.join(dataset_dir, META_FILE))
+
+
+class ChunkedDatasetWriter:
+    """Append-only dataset writer with bounded memory and resumable checkpoints
+
+    Samples are buffered in fixed-size arrays and flushed to numbered
+    chunk files in a staging directory (<dataset_dir>.partial). After every
+    flush a checkpoint records how many chunks are complete and how many
+    input items have been consumed, so an interrupted build can resume.
+    finalize() streams the chunks into the regular memory-mappable column
+    files of dataset_dir and removes the staging directory.
+    """
+
+    CHECKPOINT_FILE = 'checkpoint.json'
+
+    def __init__(self, dataset_dir, chunk_size=4096, source_id=None):
+        self.dataset_dir = dataset_dir
+        self.staging_dir = dataset_dir.rstrip('/\\') + '.partial'
+        self.chunk_size = chunk_size
+        # Identifies the input listing; a checkpoint for different input is discarded
+        self.source_id = source_id
+
+        self._features = np.zeros((chunk_size, FEATURE_DIM), dtype=np.float32)
+        self._hand_counts = np.zeros(chunk_size, dtype=np.uint8)
+        self._labels = [None] * chunk_size
+        self._paths = [None] * chunk_size
+        self._fill = 0
+
+        self.num_chunks = 0
+        self.num_samples = 0
+        self.consumed = 0
+
+    def open(self, resume=True):
+        """Prepare the staging directory; returns the number of items to skip"""
+        checkpoint = self._read_checkpoint() if resume else None
+        if checkpoint is None or checkpoint.get('source_id') != self.source_id:
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+            os.makedirs(self.staging_dir)
+            return 0
+
+        self.num_chunks = checkpoint['chunks']
+        self.num_samples = checkpoint['samples']
+        self.consumed = checkpoint['consumed']
+        # Drop chunks written after the last checkpoint (interrupted flush)
+        for chunk_file in self._chunk_files()[self.num_chunks:]:
+            os.remove(chunk_file)
+        return self.consumed
+
+    def append(self, features, label, path):
+        """Add one sample (flat feature vector of one or more hands)"""
+        row = np.asarray(features, dtype=np.float32)[:FEATURE_DIM]
+        i = self._fill
+        self._features[i, :len(row)] = row
+        self._features[i, len(row):] = 0
+        self._hand_counts[i] = len(row) // FEATURES_PER_HAND
+        self._labels[i] = label
+        self._paths[i] = path
+        self._fill += 1
+        if self._fill == self.chunk_size:
+            self._write_chunk()
+
+    def append_dataset(self, dataset):
+        """Add every sample of an existing dataset (e.g. to extend it)"""
+        labels = dataset.label_strings()
+        for i in range(len(dataset)):
+            self.append(dataset.features[i, :int(dataset.hand_counts[i]) * FEATURES_PER_HAND], labels[i],
+                        dataset.paths[i])
+
+    def flush(self, consumed):
+        """Persist buffered samples and checkpoint `consumed` input items"""
+        self._write_chunk()
+        self.consumed = consumed
+        checkpoint = {
+            'source_id': self.source_id,
+            'chunks': self.num_chunks,
+            'samples': self.num_samples,
+            'consumed': consumed,
+        }
+        tmp_file = os.path.join(self.staging_dir, self.CHECKPOINT_FILE + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_file, os.path.join(self.staging_dir, self.CHECKPOINT_FILE))
+
+    def finalize(self):
+        """Merge all chunks into dataset_dir and return the sample count"""
+        self._write_chunk()
+        chunk_files = self._chunk_files()[:self.num_chunks]
+
+        # First pass: label set and path width (only the small columns are read)
+        label_set = set()
+        path_width = 1
+        for chunk_file in chunk_files:
+            with np.load(chunk_file) as chunk:
+                label_set.update(chunk['labels'].tolist())
+                path_width = max(path_width, chunk['paths'].dtype.itemsize // 4)
+        label_names = sort_label_names(label_set)
+        codes = {name: i for i, name in enumerate(label_names)}
+
+        os.makedirs(self.dataset_dir, exist_ok=True)
+        meta_file = os.path.join(self.dataset_dir, META_FILE)
+        if os.path.exists(meta_file):
+            os.remove(meta_file)
+
+        n = self.num_samples
+        open_memmap = np.lib.format.open_memmap
+        columns = {
+            'features': open_memmap(os.path.join(self.dataset_dir, 'features.npy'), mode='w+',
+                                    dtype=np.float32, shape=(n, FEATURE_DIM)),
+            'labels': open_memmap(os.path.join(self.dataset_dir, 'labels.npy'), mode='w+',
+                                  dtype=np.int16, shape=(n,)),
+            'hand_counts': open_memmap(os.path.join(self.dataset_dir, 'hand_counts.npy'), mode='w+',
+                                       dtype=np.uint8, shape=(n,)),
+            'paths': open_memmap(os.path.join(self.dataset_dir, 'paths.npy'), mode='w+',
+                                 dtype='<U%d' % path_width, shape=(n,)),
+        }
+
+        # Second pass: copy chunk by chunk so memory stays bounded
+        offset = 0
+        for chunk_file in chunk_files:
+            with np.load(chunk_file) as chunk:
+                size = len(chunk['labels'])
+                end = offset + size
+                columns['features'][offset:end] = chunk['features']
+                columns['labels'][offset:end] = [codes[label] for label in chunk['labels'].tolist()]
+                columns['hand_counts'][offset:end] = chunk['hand_counts']
+                columns['paths'][offset:end] = chunk['paths']
+                offset = end
+        for array in columns.values():
+            array.flush()
+        del columns
+
+        write_meta(self.dataset_dir, make_meta(n, label_names))
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        return n
+
+    def _write_chunk(self):
+        if self._fill == 0:
+            return
+        n = self._fill
+        chunk_file = os.path.join(self.staging_dir, 'chunk_%06d.npz' % self.num_chunks)
+        tmp_file = chunk_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            np.savez(f,
+                     features=self._features[:n],
+                     hand_counts=self._hand_counts[:n],
+                     labels=np.asarray(self._labels[:n], dtype=np.str_),
+                     paths=np.asarray(self._paths[:n], dtype=np.str_))
+        os.replace(tmp_file, chunk_file)
+        self.num_chunks += 1
+        self.num_samples += n
+        self._fill = 0
+
+    def _chunk_files(self):
+        return sorted(glob.glob(os.path.join(self.staging_dir, 'chunk_*.npz')))
+
+    def _read_checkpoint(self):
+        checkpoint_file = os.path.join(self.staging_dir, self.CHECKPOINT_FILE)
+        if not os.path.exists(checkpoint_file):
+            return None
+        try:
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def read_meta(dataset_dir):
+    with open(os.path.join(dataset_dir, META_FILE), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('schema') != SCHEMA_NAME:
+        raise ValueError(f"{dataset_dir} is not a sign language dataset")
+    if meta.get('version') != SCHEMA_VERSION:
+        raise ValueError(f"Unsupported dataset version {meta.get('version')} (expected {SCHEMA_VERSION})")
+    if meta.get('feature_version') != FEATURE_VERSION:
+        raise ValueError(f"Dataset was built with feature version {meta.get('feature_version')}, "
+                         f"current version is {FEATURE_VERSION}. Please re-run create_dataset.py")
+    return meta
+
+
+def load_dataset(dataset_dir=DATASET_DIR, mmap=True):
+    """Load a dataset directory; columns are memory-mapped unless mmap=False"""
+    meta = read_meta(dataset_dir)
+    mmap_mode = 'r' if mmap else None
+    columns = {}
+    for name in COLUMNS:
+        columns[name] = np.load(os.path.join(dataset_dir, name + '.npy'), mmap_mode=mmap_mode)
+        if len(columns[name]) != meta['num_samples']:
+            raise ValueError(f"Column '{name}' has {len(columns[name])} rows, expected {meta['num_samples']}")
+    return Dataset(columns['features'], columns['labels'], columns['hand_counts'], columns['paths'],
+                   meta['label_names'], meta)
+
+
+def load_legacy_pickle(pickle_path=LEGACY_PICKLE):
+    """Convert an old data.pickle ({'data': [...], 'labels': [...]}) in memory"""
+    with open(pickle_path, 'rb') as f:
+        data_dict = pickle.load(f)
+    labels = [str(label) for label in data_dict['labels']]
+    label_names = sort_label_names(labels)
+    codes = {name: i for i, name in enumerate(label_names)}
+
+    features, hand_counts = pack_features(data_dict['data'])
+    label_codes = np.asarray([codes[label] for label in labels], dtype=np.int16)
+    paths = np.full(len(labels), '', dtype=np.str_)
+    return Dataset(features, label_codes, hand_counts, paths, label_names,
+                   make_meta(len(labels), label_names))
+
+
+def merge_datasets(first, second):
+    """Concatenate two datasets, re-coding labels into a shared label list"""
+    label_names = sort_label_names(first.label_names + second.label_names)
+    codes = {name: i for i, name in enumerate(label_names)}
+    labels = []
+    for dataset in (first, second):
+        remap = np.asarray([codes[name] for name in dataset.label_names], dtype=np.int16)
+        labels.append(remap[np.asarray(dataset.labels)] if len(remap) else np.asarray(dataset.labels))
+    return Dataset(np.concatenate([first.features, second.features]), np.concatenate(labels),
+                   np.concatenate([first.hand_counts, second.hand_counts]),
+                   np.concatenate([np.asarray(first.paths, dtype=np.str_), np.asarray(second.paths, dtype=np.str_)]),
+                   label_names, make_meta(len(first) + len(second), label_names))
+
+
+def load_training_data(dataset_dir=DATASET_DIR, legacy_pickle=LEGACY_PICKLE, live_dir=LIVE_DATASET_DIR):
+    """Load the dataset directory (or a legacy data.pickle) plus live-collected landmarks"""
+    live = None
+    if live_dir and os.path.exists(os.path.join(live_dir, META_FILE)):
+        live = load_dataset(live_dir)
+
+    if os.path.exists(os.path.join(dataset_dir, META_FILE)):
+        dataset = load_dataset(dataset_dir)
+    elif legacy_pickle and os.path.exists(legacy_pickle):
+        print(f"Dataset directory {dataset_dir} not found, converting legacy {legacy_pickle}")
+        dataset = load_legacy_pickle(legacy_pickle)
+    elif live is not None:
+        return live
+    else:
+        raise FileNotFoundError(f"No dataset found at {dataset_dir}. Please run create_dataset.py first.")
+
+    if live is None:
+        return dataset
+    print(f"Adding {len(live)} live-collected samples from {live_dir}")
+    return merge_datasets(dataset, live)
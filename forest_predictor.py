@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Flat Forest Predictor Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: Array-backed evaluation of a trained random forest.
+
+All trees are flattened into contiguous node arrays (feature, threshold,
+children, normalized leaf votes). A prediction walks every tree at once
+with a handful of vectorized NumPy operations per depth level, avoiding
+sklearn's per-call validation and per-tree dispatch. Results are identical
+to RandomForestClassifier / ExtraTreesClassifier predict and predict_proba.
+"""
+
+import numpy as np
+
+
+class FlatForest:
+    """Random forest stored as flat NumPy arrays
+
+    feature, threshold:  split of every node (leaves: feature 0, unused)
+    children:            (nodes, 2) left/right child; leaves point to themselves
+    leaf_values:         (nodes, classes) per-tree normalized class votes
+    roots:               index of each tree's root node
+    """
+
+    # Array names used when storing the forest (see model_store.py)
+    ARRAY_NAMES = ('feature', 'threshold', 'children', 'leaf_values', 'roots', 'classes')
+
+    def __init__(self, feature, threshold, children, leaf_values, roots, classes, max_depth):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.children = np.ascontiguousarray(children, dtype=np.intp)
+        # Flat view: child of node n is children_flat[2 * n + went_right]
+        self._children_flat = self.children.reshape(-1)
+        self.leaf_values = np.ascontiguousarray(leaf_values, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.classes_ = np.asarray(classes)
+        self.max_depth = int(max_depth)
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted RandomForestClassifier or ExtraTreesClassifier"""
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n)
+
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+            value = tree.value[:, 0, :len(model.classes_)].astype(np.float64)
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            children.append(np.stack([left, right], axis=1))
+            values.append(value / normalizer)
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(np.concatenate(features), np.concatenate(thresholds), np.concatenate(children),
+                   np.concatenate(values), np.asarray(roots), model.classes_, max_depth)
+
+    def apply(self, X):
+        """Leaf index reached in every tree, shape (samples, trees)"""
+        # sklearn evaluates splits on float32 inputs
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[0] == 1:
+            return self._apply_one(X[0])[None, :]
+
+        n = X.shape[0]
+        nodes = np.broadcast_to(self.roots, (n, len(self.roots))).copy()
+        rows = np.arange(n)[:, None]
+        for _ in range(self.max_depth):
+            went_right = X[rows, self.feature[nodes]] > self.threshold[nodes]
+            next_nodes = self._children_flat[2 * nodes + went_right]
+            if np.array_equal(next_nodes, nodes):
+                # Every tree has reached a leaf
+                break
+            nodes = next_nodes
+        return nodes
+
+    def _apply_one(self, x):
+        """Single-sample traversal of all trees in lockstep"""
+        feature, threshold, children = self.feature, self.threshold, self._children_flat
+        nodes = self.roots
+        for depth in range(self.max_depth):
+            went_right = x.take(feature.take(nodes)) > threshold.take(nodes)
+            next_nodes = children.take(2 * nodes + went_right)
+            # Checking for "all trees at a leaf" costs about as much as a
+            # level, so only do it every fourth level
+            if depth % 4 == 3 and np.array_equal(next_nodes, nodes):
+                break
+            nodes = next_nodes
+        return nodes
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        # Summing over the tree axis accumulates tree by tree, like sklearn,
+        # so the floating point results match exactly
+        proba = self.leaf_values.take(leaves, axis=0).sum(axis=1)
+        proba /= leaves.shape[1]
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def arrays(self):
+        """Node arrays by name, for saving"""
+        return {
+            'feature': self.feature.astype(np.int64, copy=False),
+            'threshold': self.threshold,
+            'children': self.children.astype(np.int64, copy=False),
+            'leaf_values': self.leaf_values,
+            'roots': self.roots.astype(np.int64, copy=False),
+            'classes': self.classes_,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, max_depth):
+        """Rebuild from arrays(); memory-mapped arrays are used without copying"""
+        return cls(arrays['feature'], arrays['threshold'], arrays['children'], arrays['leaf_values'],
+                   arrays['roots'], arrays['classes'], max_depth)
+
+
+def is_forest(model):
+    """True for fitted sklearn tree ensembles FlatForest can represent"""
+    estimators = getattr(model, 'estimators_', None)
+    return (estimators is not None and hasattr(model, 'classes_') and len(estimators) > 0
+            and all(hasattr(e, 'tree_') for e in estimators))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hand Tracking Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: MediaPipe Hands wrapper for live video.
+             In 'video' mode MediaPipe only runs palm detection until a hand is
+             found and then tracks it from frame to frame, which is much cheaper
+             than running the full detector on every frame ('static' mode).
+             Static mode can instead use region-of-interest cropping: the next
+             frame is cropped around the previous hand box before detection.
+"""
+
+import cv2
+import mediapipe as mp
+
+
+mp_hands = mp.solutions.hands
+
+MODES = ('video', 'static')
+
+
+class HandTracker:
+    """Runs MediaPipe Hands on a stream of RGB frames
+
+    mode:                      'video' (tracking) or 'static' (detect every frame)
+    min_tracking_confidence:   landmark score below which tracking is dropped
+                               and palm detection runs again (video mode only)
+    redetect_interval:         force a fresh palm detection every N tracked
+                               frames, e.g. to pick up a hand that replaced
+                               the tracked one (0 = only when tracking is lost)
+
+    roi:                       crop each frame around the previous hand box
+                               (plus roi_margin of its size on every side) and
+                               downscale it to at most roi_max_side pixels
+                               before detection. Landmarks are mapped back to
+                               full-frame coordinates, and the full frame is
+                               used whenever the hand is not found in the crop.
+                               ROI cropping is its own form of tracking and
+                               requires mode='static'.
+
+    Re-detection after a lost track is done by MediaPipe itself: once the
+    landmark score drops below min_tracking_confidence the graph runs palm
+    detection on the following frames until a hand is found again. Forcing it
+    here via reset() restarts the graph (tens of ms), so it is only used for
+    the periodic redetect_interval.
+    """
+
+    def __init__(self, mode='video', max_num_hands=1, min_detection_confidence=0.3,
+                 min_tracking_confidence=0.5, redetect_interval=0, roi=False, roi_margin=0.3,
+                 roi_max_side=320):
+        if mode not in MODES:
+            raise ValueError(f"Unknown tracking mode '{mode}', expected one of {MODES}")
+        if roi and mode != 'static':
+            raise ValueError("ROI cropping requires mode='static'")
+        self.mode = mode
+        self.max_num_hands = max_num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.redetect_interval = redetect_interval
+        self.roi = roi
+        self.roi_margin = roi_margin
+        self.roi_max_side = roi_max_side
+        self.hands = mp_hands.Hands(static_image_mode=(mode == 'static'),
+                                    max_num_hands=max_num_hands,
+                                    min_detection_confidence=min_detection_confidence,
+                                    min_tracking_confidence=min_tracking_confidence)
+
+        self.frames = 0
+        self.lost_events = 0
+        self.redetections = 0
+        self._tracking = False
+        self._tracked_frames = 0
+        # Normalized (min_x, min_y, max_x, max_y) of the last detected hand(s)
+        self.last_box = None
+        self.roi_hits = 0
+
+    def process(self, frame_rgb):
+        """Detect/track hands in one RGB frame and return MediaPipe results"""
+        self.frames += 1
+        if self.roi:
+            return self._process_roi(frame_rgb)
+        results = self.hands.process(frame_rgb)
+        if self.mode == 'static':
+            return results
+
+        found = bool(results.multi_hand_landmarks)
+        if found:
+            self._tracked_frames += 1
+            if self.redetect_interval and self._tracked_frames >= self.redetect_interval:
+                self.redetect()
+        elif self._tracking:
+            self.lost_events += 1
+            self._tracked_frames = 0
+        self._tracking = found
+        return results
+
+    def _process_roi(self, frame_rgb):
+        H, W = frame_rgb.shape[:2]
+        rect = self._roi_rect(W, H) if self.last_box is not None else None
+        if rect is not None and rect[2] - rect[0] >= 16 and rect[3] - rect[1] >= 16:
+            x0, y0, x1, y1 = rect
+            crop = frame_rgb[y0:y1, x0:x1]
+            cw, ch = x1 - x0, y1 - y0
+            scale = self.roi_max_side / max(cw, ch)
+            if scale < 1.0:
+                crop = cv2.resize(crop, (max(1, int(cw * scale)), max(1, int(ch * scale))),
+                                  interpolation=cv2.INTER_AREA)
+            results = self.hands.process(crop)
+            if results.multi_hand_landmarks:
+                # Map crop-normalized landmarks back to full-frame coordinates
+                for hand_landmarks in results.multi_hand_landmarks:
+                    for lm in hand_landmarks.landmark:
+                        lm.x = (x0 + lm.x * cw) / W
+                        lm.y = (y0 + lm.y * ch) / H
+                self.roi_hits += 1
+                self._update_box(results)
+                return results
+
+        # No previous box, or the hand left the crop: search the full frame
+        results = self.hands.process(frame_rgb)
+        self._update_box(results)
+        return results
+
+    def _roi_rect(self, W, H):
+        """Pixel crop rectangle around last_box expanded by roi_margin"""
+        min_x, min_y, max_x, max_y = self.last_box
+        margin_x = (max_x - min_x) * self.roi_margin
+        margin_y = (max_y - min_y) * self.roi_margin
+        # Hands rotate, so keep the crop at least as wide as it is tall
+        half = max(max_x - min_x + 2 * margin_x, (max_y - min_y + 2 * margin_y) * H / W) / 2
+        cx, cy = (min_x + max_x) / 2, (min_y + max_y) / 2
+        half_y = half * W / H
+        x0 = min(W, max(0, int((cx - half) * W)))
+        y0 = min(H, max(0, int((cy - half_y) * H)))
+        x1 = max(0, min(W, int((cx + half) * W) + 1))
+        y1 = max(0, min(H, int((cy + half_y) * H) + 1))
+        return x0, y0, x1, y1
+
+    def _update_box(self, results):
+        if not results.multi_hand_landmarks:
+            self.last_box = None
+            return
+        xs = [lm.x for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        self.last_box = (min(xs), min(ys), max(xs), max(ys))
+
+    def redetect(self):
+        """Clear tracking state; the next frame runs full palm detection"""
+        self.hands.reset()
+        self.redetections += 1
+        self._tracked_frames = 0
+
+    def close(self):
+        self.hands.close()
@@ -6,86 +6,351 @@ Real-time Inference Module
 Author: Nayana Pabasara
 Created: 2024
 Description: Performs real-time sign language recognition
+
+Without --input the webcam is used. With --input the detector runs headless
+over video files and image folders and writes per-frame predictions:
+
+    python inference_classifier.py --input session1.mp4 data/ --output results.csv
 """
 
-import pickle
+import os
+import csv
+import json
+import time
+import argparse
+import multiprocessing
 
 import cv2
 import mediapipe as mp
-import numpy as np
-
-model_dict = pickle.load(open('./model.p', 'rb'))
-model = model_dict['model']
 
-cap = cv2.VideoCapture(0)
+from batch_classifier import BatchClassifier
+from camera import open_camera
+from hand_features import HandFeatureExtractor, NUM_LANDMARKS
+from hand_tracker import HandTracker, MODES
+from model_store import class_display_name, load_classifier
 
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 mp_drawing_styles = mp.solutions.drawing_styles
 
-hands = mp_hands.Hands(static_image_mode=True, min_detection_confidence=0.3, min_tracking_confidence=0.3)
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+# Images of a folder handed to a worker at a time
+IMAGE_CHUNK = 64
+# Detected hands classified per predict call in batch mode
+BATCH_SIZE = 256
+
+RESULT_FIELDS = ['path', 'frame', 'time_s', 'label', 'character', 'confidence'] + \
+    [f"{axis}{i}" for i in range(NUM_LANDMARKS) for axis in 'xy']
+
+# Per-process state for batch mode (set by init_batch_worker)
+batch_model = None
+batch_options = None
+# Static-image tracker shared by all image tasks of a worker
+batch_static_tracker = None
+
+
+def collect_tasks(inputs):
+    """Split the inputs into independent units of work
+
+    A video is one task (tracking state carries over between its frames);
+    the images of a folder are independent and are split into chunks.
+    """
+    tasks = []
+    for path in inputs:
+        if os.path.isdir(path):
+            images = []
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names.sort()
+                images.extend(os.path.join(dir_path, f) for f in sorted(file_names)
+                              if f.lower().endswith(IMAGE_EXTENSIONS))
+            for i in range(0, len(images), IMAGE_CHUNK):
+                tasks.append(('images', images[i:i + IMAGE_CHUNK]))
+        elif path.lower().endswith(IMAGE_EXTENSIONS):
+            tasks.append(('images', [path]))
+        elif os.path.isfile(path):
+            tasks.append(('video', path))
+        else:
+            raise FileNotFoundError(f"Input {path} does not exist")
+    return tasks
+
+
+def init_batch_worker(options):
+    """Process pool initializer: load the model and build the static tracker once per worker"""
+    global batch_model, batch_options, batch_static_tracker
+    batch_model = load_classifier()
+    batch_options = options
+    batch_static_tracker = HandTracker(mode='static', max_num_hands=1, min_detection_confidence=0.3,
+                                       min_tracking_confidence=options['tracking_confidence'])
+
+
+def create_tracker(sequential):
+    """Tracker for a task; tracking and ROI cropping only apply to consecutive frames
+
+    Static detection keeps no state between frames, so it uses the worker's
+    shared tracker instead of building a new MediaPipe graph per task.
+    """
+    options = batch_options
+    roi = options['roi'] and sequential
+    mode = options['mode'] if sequential and not roi else 'static'
+    if mode == 'static' and not roi:
+        return batch_static_tracker
+    return HandTracker(mode=mode, max_num_hands=1, min_detection_confidence=0.3,
+                       min_tracking_confidence=options['tracking_confidence'],
+                       redetect_interval=options['redetect_interval'], roi=roi)
+
+
+def iter_task_frames(task):
+    """Yield (path, frame index, time in seconds or None, RGB frame)"""
+    kind, source = task
+    if kind == 'video':
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            raise FileNotFoundError(f"Could not open video {source}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        index = 0
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield source, index, index / fps if fps > 0 else None, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                index += 1
+        finally:
+            cap.release()
+    else:
+        for path in source:
+            img = cv2.imread(path)
+            if img is not None:
+                yield path, 0, None, cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def fill_rows(rows, predictions):
+    for prediction in predictions:
+        row = rows[prediction.key]
+        row['label'] = str(prediction.label)
+        row['character'] = class_display_name(prediction.label)
+        row['confidence'] = prediction.confidence
+
+
+def process_task(task):
+    """Detect and classify every frame of one task; returns rows and timing"""
+    start = time.perf_counter()
+    tracker = create_tracker(task[0] == 'video')
+    extractor = HandFeatureExtractor(max_hands=1)
+
+    # Hands are classified in batches rather than one predict call per frame
+    classifier = BatchClassifier(batch_model, max_batch_size=BATCH_SIZE)
+    rows = []
+    frames = 0
+    for path, index, time_s, frame_rgb in iter_task_frames(task):
+        frames += 1
+        results = tracker.process(frame_rgb)
+        row = {'path': path, 'frame': index, 'time_s': time_s, 'label': None, 'character': None,
+               'confidence': None, 'landmarks': None}
+        rows.append(row)
+        if results.multi_hand_landmarks:
+            # add() copies the features into the batch buffer
+            features = extractor.extract(results.multi_hand_landmarks)
+            row['landmarks'] = extractor.hand_points()[0].tolist()
+            fill_rows(rows, classifier.add(features, len(rows) - 1))
+    if tracker is not batch_static_tracker:
+        tracker.close()
+    fill_rows(rows, classifier.flush())
+    return rows, frames, time.perf_counter() - start
+
+
+class CsvResultWriter:
+    """One row per frame; landmark columns x0, y0 ... x20, y20"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(RESULT_FIELDS)
+
+    def write(self, rows):
+        for row in rows:
+            landmarks = row['landmarks']
+            coords = [c for point in landmarks for c in point] if landmarks else [''] * (2 * NUM_LANDMARKS)
+            self.writer.writerow([row['path'], row['frame'], '' if row['time_s'] is None else row['time_s'],
+                                  row['label'] or '', row['character'] or '',
+                                  '' if row['confidence'] is None else row['confidence']] + coords)
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlResultWriter:
+    """One JSON object per frame; landmarks as a list of [x, y] pairs"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(row) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetResultWriter:
+    """Columnar output; needs pyarrow (pip install pyarrow)"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow (or use .csv / .jsonl)")
+        self.pa = pa
+        self.schema = pa.schema([('path', pa.string()), ('frame', pa.int64()), ('time_s', pa.float64()),
+                                 ('label', pa.string()), ('character', pa.string()),
+                                 ('confidence', pa.float64()), ('landmarks', pa.list_(pa.list_(pa.float32(), 2)))])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        if rows:
+            self.writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+RESULT_WRITERS = {'.csv': CsvResultWriter, '.jsonl': JsonlResultWriter, '.parquet': ParquetResultWriter}
+
+
+def run_batch(args):
+    """Headless detection + classification over video files and image folders"""
+    extension = os.path.splitext(args.output)[1].lower()
+    if extension not in RESULT_WRITERS:
+        raise SystemExit(f"Unsupported output format '{extension}' (use {', '.join(RESULT_WRITERS)})")
+    tasks = collect_tasks(args.input)
+    if not tasks:
+        raise SystemExit("No videos or images found in the inputs")
+
+    options = {'mode': args.mode, 'tracking_confidence': args.tracking_confidence,
+               'redetect_interval': args.redetect_interval, 'roi': args.roi}
+    workers = max(1, min(args.workers, len(tasks)))
+    writer = RESULT_WRITERS[extension](args.output)
+    total_frames = 0
+    total_hands = 0
+    busy_seconds = 0.0
+    start = time.perf_counter()
+    pool = None
+    try:
+        if workers > 1:
+            pool = multiprocessing.Pool(processes=workers, initializer=init_batch_worker, initargs=(options,))
+            results = pool.imap(process_task, tasks)
+        else:
+            init_batch_worker(options)
+            results = map(process_task, tasks)
+        # Results arrive in task order, so the output is the same for any
+        # number of workers
+        for task, (rows, frames, seconds) in zip(tasks, results):
+            writer.write(rows)
+            total_frames += frames
+            total_hands += sum(row['label'] is not None for row in rows)
+            busy_seconds += seconds
+            if task[0] == 'video':
+                print(f"✓ {task[1]}: {frames} frames, {frames / max(seconds, 1e-9):.1f} fps")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Processed {total_frames} frames ({total_hands} with a hand) in {elapsed:.1f}s "
+          f"with {workers} worker(s): {total_frames / max(elapsed, 1e-9):.1f} fps aggregate, "
+          f"{total_frames / max(busy_seconds, 1e-9):.1f} fps per worker")
+    print(f"Results written to {args.output}")
+    return total_frames
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sign language recognition from the webcam, or headless over "
+                                                 "recorded videos and image folders")
+    parser.add_argument('--input', nargs='+', default=None,
+                        help="Video files, images or image folders to process headless instead of the webcam")
+    parser.add_argument('--output', default='predictions.csv',
+                        help="Batch results file: .csv, .jsonl or .parquet (needs pyarrow)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processes for batch mode (files are processed in parallel)")
+    parser.add_argument('--mode', choices=MODES, default='video',
+                        help="'video' tracks the hand between frames, 'static' runs full detection on every frame")
+    parser.add_argument('--tracking-confidence', type=float, default=0.5,
+                        help="Minimum landmark score to keep tracking (video mode)")
+    parser.add_argument('--redetect-interval', type=int, default=0,
+                        help="Force palm re-detection every N tracked frames (0 = only when tracking is lost)")
+    parser.add_argument('--roi', action='store_true',
+                        help="Crop each frame around the previous hand box before detection (implies --mode static)")
+    return parser.parse_args()
+
+
+def run_webcam(args):
+    model = load_classifier()
+
+    cap = open_camera(0)
+
+    # The classifier is trained on a single hand (42 features)
+    hands = HandTracker(mode='static' if args.roi else args.mode, max_num_hands=1, min_detection_confidence=0.3,
+                        min_tracking_confidence=args.tracking_confidence,
+                        redetect_interval=args.redetect_interval, roi=args.roi)
+    extractor = HandFeatureExtractor(max_hands=1)
 
-# Create labels dictionary for A-Z (26 letters) + 0-9 (10 numbers) = 36 total
-labels_dict = {}
-# Add letters A-Z (classes 0-25)
-for i in range(26):
-    labels_dict[i] = chr(ord('A') + i)
-# Add numbers 0-9 (classes 26-35)
-for i in range(10):
-    labels_dict[i + 26] = str(i)
-while True:
+    while True:
 
-    data_aux = []
-    x_ = []
-    y_ = []
+        ret, frame = cap.read()
+        if not ret:
+            break
 
-    ret, frame = cap.read()
+        H, W, _ = frame.shape
 
-    H, W, _ = frame.shape
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = hands.process(frame_rgb)
+        if results.multi_hand_landmarks:
+            for hand_landmarks in results.multi_hand_landmarks:
+                mp_drawing.draw_landmarks(
+                    frame,  # image to draw
+                    hand_landmarks,  # model output
+                    mp_hands.HAND_CONNECTIONS,  # hand connections
+                    mp_drawing_styles.get_default_hand_landmarks_style(),
+                    mp_drawing_styles.get_default_hand_connections_style())
 
-    results = hands.process(frame_rgb)
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            mp_drawing.draw_landmarks(
-                frame,  # image to draw
-                hand_landmarks,  # model output
-                mp_hands.HAND_CONNECTIONS,  # hand connections
-                mp_drawing_styles.get_default_hand_landmarks_style(),
-                mp_drawing_styles.get_default_hand_connections_style())
+            features = extractor.extract(results.multi_hand_landmarks)
+            min_x, min_y, max_x, max_y = extractor.bounds()
 
-        for hand_landmarks in results.multi_hand_landmarks:
-            for i in range(len(hand_landmarks.landmark)):
-                x = hand_landmarks.landmark[i].x
-                y = hand_landmarks.landmark[i].y
+            x1 = int(min_x * W) - 10
+            y1 = int(min_y * H) - 10
 
-                x_.append(x)
-                y_.append(y)
+            x2 = int(max_x * W) - 10
+            y2 = int(max_y * H) - 10
 
-            for i in range(len(hand_landmarks.landmark)):
-                x = hand_landmarks.landmark[i].x
-                y = hand_landmarks.landmark[i].y
-                data_aux.append(x - min(x_))
-                data_aux.append(y - min(y_))
+            prediction = model.predict(features.reshape(1, -1))
 
-        x1 = int(min(x_) * W) - 10
-        y1 = int(min(y_) * H) - 10
+            predicted_character = class_display_name(prediction[0])
 
-        x2 = int(max(x_) * W) - 10
-        y2 = int(max(y_) * H) - 10
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 0), 4)
+            cv2.putText(frame, predicted_character, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 0, 0), 3,
+                        cv2.LINE_AA)
 
-        prediction = model.predict([np.asarray(data_aux)])
+        cv2.imshow('frame', frame)
+        cv2.waitKey(1)
 
-        predicted_character = labels_dict[int(prediction[0])]
+    hands.close()
+    cap.release()
+    cv2.destroyAllWindows()
 
-        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 0), 4)
-        cv2.putText(frame, predicted_character, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (0, 0, 0), 3,
-                    cv2.LINE_AA)
 
-    cv2.imshow('frame', frame)
-    cv2.waitKey(1)
+def main():
+    args = parse_args()
+    if args.input:
+        run_batch(args)
+    else:
+        run_webcam(args)
 
 
-cap.release()
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Inference Server Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: Local inference service sharing one warm model between processes.
+
+The server keeps the model (and, for JPEG requests, one MediaPipe Hands
+graph) loaded and answers requests over localhost TCP or a Unix socket.
+Requests that arrive together from different connections are classified
+in one vectorized call.
+
+Protocol (little-endian). Every message starts with an 8-byte header
+
+    uint8 kind/status, uint8 reserved, uint16 rows, uint32 payload bytes
+
+followed by the payload. Requests:
+
+    INFO       (0)  empty payload; reply is JSON (classes, label map, feature size)
+    LANDMARKS  (1)  rows x 42 float32 feature vectors
+    JPEG       (2)  one encoded image; rows = hands found (0 if none)
+
+Replies to LANDMARKS / JPEG carry rows uint16 class indices followed by a
+rows x classes float32 probability matrix. Errors use status 1 and a UTF-8
+message. Requests on one connection are answered in order.
+
+Usage:
+    python inference_server.py serve [--port 8765 | --socket /tmp/sign.sock]
+    python inference_server.py bench [--clients 4] [--requests 2000]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import struct
+import asyncio
+import argparse
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from hand_features import FEATURES_PER_HAND, HandFeatureExtractor
+from model_store import class_display_name, load_classifier
+
+
+HOST = '127.0.0.1'
+PORT = 8765
+
+MSG_INFO = 0
+MSG_LANDMARKS = 1
+MSG_JPEG = 2
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+HEADER = struct.Struct('<BBHI')
+MAX_PAYLOAD = 16 * 1024 * 1024
+MAX_HANDS = 2
+
+
+class InferenceServer:
+    """asyncio server around one loaded model
+
+    Classification requests are queued and handled by a callback scheduled
+    with call_soon, so everything that arrived during the same event loop
+    iteration is classified together without waiting on a timer.
+    """
+
+    def __init__(self, model, max_batch_size=256):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.info = json.dumps({
+            'classes': [str(c) for c in model.classes_],
+            'label_map': {str(c): class_display_name(c) for c in model.classes_},
+            'n_features': FEATURES_PER_HAND,
+        }).encode('utf-8')
+        self._pending = []
+        self._scheduled = False
+        # MediaPipe graphs are not thread-safe: all JPEG requests share one thread
+        self._detector = ThreadPoolExecutor(max_workers=1)
+        self._tracker = None
+        self._extractor = HandFeatureExtractor(max_hands=MAX_HANDS)
+        self.requests = 0
+        self.batches = 0
+        self.rows = 0
+
+    async def handle_connection(self, reader, writer):
+        sock = writer.get_extra_info('socket')
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                kind, _, rows, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+                if length > MAX_PAYLOAD:
+                    writer.write(error_reply(f"Payload of {length} bytes exceeds {MAX_PAYLOAD}"))
+                    break
+                payload = await reader.readexactly(length)
+                try:
+                    reply = await self.dispatch(kind, rows, payload)
+                except Exception as e:
+                    reply = error_reply(str(e))
+                writer.write(reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, kind, rows, payload):
+        self.requests += 1
+        if kind == MSG_INFO:
+            return HEADER.pack(STATUS_OK, 0, 0, len(self.info)) + self.info
+        if kind == MSG_LANDMARKS:
+            if len(payload) != rows * FEATURES_PER_HAND * 4:
+                raise ValueError(f"Expected {rows} x {FEATURES_PER_HAND} float32 values, got {len(payload)} bytes")
+            features = np.frombuffer(payload, dtype='<f4').reshape(rows, FEATURES_PER_HAND)
+        elif kind == MSG_JPEG:
+            loop = asyncio.get_running_loop()
+            features = await loop.run_in_executor(self._detector, self.detect, payload)
+        else:
+            raise ValueError(f"Unknown request kind {kind}")
+        if len(features) == 0:
+            return HEADER.pack(STATUS_OK, 0, 0, 0)
+        indices, proba = await self.classify(features)
+        body = indices.astype('<u2').tobytes() + proba.astype('<f4').tobytes()
+        return HEADER.pack(STATUS_OK, 0, len(indices), len(body)) + body
+
+    def detect(self, jpeg):
+        """Decode a JPEG and return one feature row per detected hand"""
+        import cv2
+        from hand_tracker import HandTracker
+
+        if self._tracker is None:
+            self._tracker = HandTracker(mode='static', max_num_hands=MAX_HANDS, min_detection_confidence=0.3)
+        image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Could not decode image")
+        results = self._tracker.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        if not results.multi_hand_landmarks:
+            return np.empty((0, FEATURES_PER_HAND), dtype=np.float32)
+        return self._extractor.per_hand(results.multi_hand_landmarks).copy()
+
+    def classify(self, features):
+        """Queue feature rows; resolves to (class indices, probabilities)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((features, future))
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._run_batch)
+        return future
+
+    def _run_batch(self):
+        pending = self._pending
+        self._pending = []
+        self._scheduled = False
+        X = pending[0][0] if len(pending) == 1 else np.concatenate([features for features, _ in pending])
+        try:
+            proba = np.concatenate([self.model.predict_proba(X[i:i + self.max_batch_size])
+                                    for i in range(0, len(X), self.max_batch_size)])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        indices = np.argmax(proba, axis=1)
+        self.batches += 1
+        self.rows += len(X)
+        start = 0
+        for features, future in pending:
+            end = start + len(features)
+            # The future is cancelled if its connection went away meanwhile
+            if not future.done():
+                future.set_result((indices[start:end], proba[start:end]))
+            start = end
+
+    def stats(self):
+        return (f"{self.requests} requests, {self.rows} rows classified in {self.batches} batches "
+                f"({self.rows / max(1, self.batches):.1f} rows per batch)")
+
+
+def error_reply(message):
+    body = message.encode('utf-8')
+    return HEADER.pack(STATUS_ERROR, 0, 0, len(body)) + body
+
+
+async def serve(model, host=HOST, port=PORT, socket_path=None, max_batch_size=256):
+    server = InferenceServer(model, max_batch_size=max_batch_size)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        listener = await asyncio.start_unix_server(server.handle_connection, path=socket_path)
+        print(f"✓ Serving on {socket_path}")
+    else:
+        listener = await asyncio.start_server(server.handle_connection, host, port)
+        print(f"✓ Serving on {host}:{port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+        print(server.stats())
+
+
+class InferenceClient:
+    """Blocking client for InferenceServer"""
+
+    def __init__(self, socket_path=None, host=HOST, port=PORT, timeout=5.0):
+        if socket_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(socket_path)
+        else:
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._header = bytearray(HEADER.size)
+        self.info = json.loads(self._request(MSG_INFO, 0, b'')[1].decode('utf-8'))
+        self.classes = np.asarray(self.info['classes'])
+
+    def _recv_into(self, buffer):
+        view = memoryview(buffer)
+        while len(view):
+            n = self.sock.recv_into(view)
+            if n == 0:
+                raise ConnectionError("Inference server closed the connection")
+            view = view[n:]
+
+    def _request(self, kind, rows, payload):
+        self.sock.sendall(HEADER.pack(kind, 0, rows, len(payload)) + payload)
+        self._recv_into(self._header)
+        status, _, rows, length = HEADER.unpack(self._header)
+        body = bytearray(length)
+        self._recv_into(body)
+        if status != STATUS_OK:
+            raise RuntimeError(f"Inference server error: {body.decode('utf-8')}")
+        return rows, body
+
+    def _decode(self, rows, body):
+        indices = np.frombuffer(body, dtype='<u2', count=rows)
+        proba = np.frombuffer(body, dtype='<f4', offset=rows * 2).reshape(rows, len(self.classes))
+        return self.classes.take(indices), proba
+
+    def classify(self, features):
+        """Classify one (42,) vector or a (rows, 42) matrix; returns (labels, probabilities)"""
+        features = np.ascontiguousarray(features, dtype='<f4').reshape(-1, FEATURES_PER_HAND)
+        return self._decode(*self._request(MSG_LANDMARKS, len(features), features.tobytes()))
+
+    def classify_jpeg(self, jpeg):
+        """Detect and classify the hands in an encoded image (empty arrays if none)"""
+        return self._decode(*self._request(MSG_JPEG, 0, bytes(jpeg)))
+
+    def classify_frame(self, frame_bgr, quality=90):
+        import cv2
+
+        ok, jpeg = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Could not encode frame")
+        return self.classify_jpeg(jpeg.tobytes())
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def bench_client(options):
+    """One benchmark client process; returns per-request latencies in ms"""
+    socket_path, host, port, requests, seed = options
+    rng = np.random.default_rng(seed)
+    samples = rng.uniform(0.0, 0.3, size=(64, FEATURES_PER_HAND)).astype(np.float32)
+    times_ms = []
+    with InferenceClient(socket_path, host, port) as client:
+        for i in range(50):
+            client.classify(samples[i % len(samples)])
+        for i in range(requests):
+            start = time.perf_counter()
+            client.classify(samples[i % len(samples)])
+            times_ms.append((time.perf_counter() - start) * 1000)
+    return times_ms
+
+
+def run_bench(args):
+    """Round-trip latency of the landmark path against a running server"""
+    from benchmark import summarize
+
+    model = load_classifier()
+    x = np.random.default_rng(0).uniform(0.0, 0.3, size=(1, FEATURES_PER_HAND)).astype(np.float32)
+    model.predict_proba(x)
+    local_ms = []
+    for _ in range(500):
+        start = time.perf_counter()
+        model.predict_proba(x)
+        local_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    options = [(args.socket, args.host, args.port, args.requests, seed) for seed in range(args.clients)]
+    with multiprocessing.Pool(args.clients) as pool:
+        results = pool.map(bench_client, options)
+    elapsed = time.perf_counter() - start
+    round_trip = summarize([t for times in results for t in times])
+    local = summarize(local_ms)
+    total = args.clients * args.requests
+    print(f"{args.clients} client(s) x {args.requests} requests: {total / elapsed:.0f} requests/s")
+    print(f"round trip p50 {round_trip['p50'] * 1000:.0f}us, p95 {round_trip['p95'] * 1000:.0f}us; "
+          f"in-process predict p50 {local['p50'] * 1000:.0f}us; "
+          f"overhead ~{(round_trip['p50'] - local['p50']) * 1000:.0f}us per request")
+    return round_trip
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local sign language inference server")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('serve', "Run the server"), ('bench', "Benchmark a running server")):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('--host', default=HOST)
+        sub.add_argument('--port', type=int, default=PORT)
+        sub.add_argument('--socket', default=None, help="Unix socket path instead of TCP")
+    subparsers.choices['serve'].add_argument('--max-batch', type=int, default=256,
+                                             help="Maximum rows per predict call")
+    subparsers.choices['bench'].add_argument('--clients', type=int, default=4, help="Client processes")
+    subparsers.choices['bench'].add_argument('--requests', type=int, default=2000, help="Requests per client")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.socket and not hasattr(socket, 'AF_UNIX'):
+        sys.exit("Unix sockets are not available on this platform, use --port")
+    if args.command == 'serve':
+        model = load_classifier()
+        try:
+            asyncio.run(serve(model, args.host, args.port, args.socket, args.max_batch))
+        except KeyboardInterrupt:
+            pass
+    else:
+        run_bench(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Landmark Augmentation Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: Grows the training set with synthetic samples in landmark space.
+
+Every feature vector is a hand's 21 (x, y) landmarks offset by their minimum,
+so new plausible samples can be made without recollecting images: mirror
+the hand, rotate it slightly, jitter its scale and aspect ratio and move
+every point by a little noise, then offset by the new minimum again. All
+transforms are applied to the whole (N, 21, 2) array at once with a
+per-sample 2x2 matrix, so hundreds of thousands of samples are generated
+per second.
+
+Landmarks are normalized image coordinates, so x is stretched by the frame's
+aspect ratio before rotating; otherwise a rotation would also shear the hand
+on a 4:3 camera frame.
+"""
+
+import numpy as np
+
+from hand_features import FEATURES_PER_HAND, NUM_LANDMARKS
+
+
+# Defaults: probability of mirroring a sample, maximum rotation in degrees,
+# relative scale / aspect jitter, and per-point noise in normalized units
+MIRROR_PROB = 0.5
+MAX_ROTATION_DEG = 15.0
+SCALE_JITTER = 0.1
+ASPECT_JITTER = 0.05
+NOISE_STD = 0.004
+# Width / height of the frames the landmarks were detected on
+FRAME_ASPECT = 640 / 480
+
+
+def augment_points(points, rng, mirror_prob=MIRROR_PROB, max_rotation_deg=MAX_ROTATION_DEG,
+                   scale_jitter=SCALE_JITTER, aspect_jitter=ASPECT_JITTER, noise_std=NOISE_STD,
+                   frame_aspect=FRAME_ASPECT):
+    """Randomly transformed copy of an (N, 21, 2) landmark array, offset by each sample's minimum"""
+    n = len(points)
+    out = np.array(points, dtype=np.float32, copy=True)
+    out[..., 0] *= frame_aspect
+    out -= out.mean(axis=1, keepdims=True)
+
+    # Per-sample linear map: optional mirror, rotation, then scale and aspect
+    theta = np.deg2rad(rng.uniform(-max_rotation_deg, max_rotation_deg, n))
+    scale = rng.uniform(1.0 - scale_jitter, 1.0 + scale_jitter, n)
+    aspect = rng.uniform(1.0 - aspect_jitter, 1.0 + aspect_jitter, n)
+    flip = np.where(rng.random(n) < mirror_prob, -1.0, 1.0)
+    cos, sin = np.cos(theta), np.sin(theta)
+    sx, sy = scale * aspect, scale / aspect
+    # Row vectors are multiplied from the left, so this is the transpose of
+    # [[sx, 0], [0, sy]] @ R(theta) @ [[flip, 0], [0, 1]]
+    transform = np.empty((n, 2, 2), dtype=np.float32)
+    transform[:, 0, 0] = flip * cos * sx
+    transform[:, 0, 1] = flip * sin * sy
+    transform[:, 1, 0] = -sin * sx
+    transform[:, 1, 1] = cos * sy
+    out = np.matmul(out, transform)
+
+    out[..., 0] /= frame_aspect
+    if noise_std > 0:
+        out += rng.standard_normal(out.shape, dtype=np.float32) * np.float32(noise_std)
+    out -= out.min(axis=1, keepdims=True)
+    return out
+
+
+def augment_features(features, labels, copies, seed=0, **params):
+    """Original (N, 42) samples followed by `copies` augmented versions of each
+
+    Returns (features, labels); params are passed on to augment_points().
+    """
+    features = np.asarray(features, dtype=np.float32)
+    labels = np.asarray(labels)
+    if copies <= 0:
+        return features, labels
+    rng = np.random.default_rng(seed)
+    points = features.reshape(-1, NUM_LANDMARKS, 2)
+    synthetic = augment_points(np.tile(points, (copies, 1, 1)), rng, **params)
+    return (np.concatenate([features, synthetic.reshape(-1, FEATURES_PER_HAND)]),
+            np.concatenate([labels, np.tile(labels, copies)]))
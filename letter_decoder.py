@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Letter Decoder Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: Turns per-frame class probabilities into a stable letter stream.
+
+Per-frame predictions flicker between similar signs. The decoder smooths
+predict_proba output over time, either with an exponential moving average
+or with a majority vote over a sliding window of per-frame winners kept in a
+ring buffer. A letter is committed to the text once the smoothed winner has
+been stable for hold_ms, and is not repeated until another letter has been
+committed or the hand leaves the frame for release_ms (so double letters are
+signed by briefly dropping the hand).
+
+Every update is a fixed number of operations on preallocated arrays, with
+cost proportional to the number of classes and independent of the window
+length.
+"""
+
+import time
+import threading
+
+import numpy as np
+
+from model_store import class_display_name
+
+
+METHODS = ('ema', 'vote')
+
+
+class LetterDecoder:
+    """Streaming smoother + debouncer over predict_proba rows"""
+
+    def __init__(self, classes, method='ema', alpha=0.3, window=8, min_confidence=0.5, hold_ms=600,
+                 release_ms=300, max_text=200):
+        if method not in METHODS:
+            raise ValueError(f"Unknown smoothing method '{method}', expected one of {METHODS}")
+        self.method = method
+        self.alpha = alpha
+        self.window = window
+        self.min_confidence = min_confidence
+        self.hold_ms = hold_ms
+        self.release_ms = release_ms
+        self.max_text = max_text
+        # Committed characters; replaced (never mutated) so other threads can
+        # read it. Commits (detection thread) and clear() (UI thread) take
+        # the lock so a commit cannot bring back cleared text
+        self.text = ''
+        self._text_lock = threading.Lock()
+        self.set_classes(classes)
+
+    def set_classes(self, classes):
+        """Start smoothing for a (new) model's classes; the committed text is kept"""
+        self.classes = np.asarray(classes)
+        self.display = [class_display_name(c) for c in self.classes]
+        n = len(self.classes)
+        self._ema = np.zeros(n, dtype=np.float64)
+        self._delta = np.zeros(n, dtype=np.float64)
+        self._ring = np.zeros(self.window, dtype=np.intp)
+        self._counts = np.zeros(n, dtype=np.int64)
+        self._committed = None
+        self._lost_since = None
+        self.reset()
+
+    def reset(self):
+        """Forget the smoothing history (e.g. when the hand is lost)"""
+        self._primed = False
+        self._counts[:] = 0
+        self._filled = 0
+        self._pos = 0
+        self._best = None
+        self._score = 0.0
+        self._candidate = None
+        self._since = 0.0
+
+    def clear(self):
+        """Drop the committed text (safe to call while another thread updates)"""
+        with self._text_lock:
+            self.text = ''
+            self._committed = None
+
+    def current(self):
+        """(character, score) of the smoothed winner, or (None, 0.0) before the first update"""
+        if self._best is None:
+            return None, 0.0
+        return self.display[self._best], self._score
+
+    def update(self, proba, now=None):
+        """Feed one frame's probabilities (None if no hand); returns a newly committed character or None"""
+        if now is None:
+            now = time.perf_counter()
+        if proba is None:
+            return self._no_hand(now)
+        self._lost_since = None
+
+        if self.method == 'ema':
+            best, score = self._update_ema(proba)
+        else:
+            best, score = self._update_vote(proba)
+        self._best = best
+        self._score = score
+
+        # The hold time runs while the smoothed winner stays the same; a
+        # letter is committed once it has been held with enough confidence
+        if best != self._candidate:
+            self._candidate = best
+            self._since = now
+        if (best != self._committed and score >= self.min_confidence
+                and (now - self._since) * 1000.0 >= self.hold_ms):
+            return self._commit(best)
+        return None
+
+    def _update_ema(self, proba):
+        ema = self._ema
+        if not self._primed:
+            ema[:] = proba
+            self._primed = True
+        else:
+            np.subtract(proba, ema, out=self._delta)
+            self._delta *= self.alpha
+            ema += self._delta
+        best = int(ema.argmax())
+        return best, float(ema[best])
+
+    def _update_vote(self, proba):
+        label = int(np.argmax(proba))
+        if self._filled == self.window:
+            # Ring buffer full: the oldest vote drops out of the window
+            self._counts[self._ring[self._pos]] -= 1
+        else:
+            self._filled += 1
+        self._ring[self._pos] = label
+        self._counts[label] += 1
+        self._pos = (self._pos + 1) % self.window
+        best = int(self._counts.argmax())
+        return best, self._counts[best] / self._filled
+
+    def _no_hand(self, now):
+        if self._lost_since is None:
+            self._lost_since = now
+            self.reset()
+        elif (now - self._lost_since) * 1000.0 >= self.release_ms:
+            # Hand was away long enough: the same letter may be signed again
+            self._committed = None
+        return None
+
+    def _commit(self, index):
+        char = self.display[index]
+        with self._text_lock:
+            self._committed = index
+            self.text = (self.text + char)[-self.max_text:]
+        return char
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Model Store Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: Fast-loading, versioned model artifact format.
+
+A model artifact is a directory with a small JSON manifest and the model's
+numeric arrays as plain .npy files:
+
+    model/
+        manifest.json                  format version, model kind, feature
+                                       schema, label map, training dataset
+                                       hash, metrics
+        feature-<version>.npy ...      flat forest node arrays (memory-mapped
+                                       on load)
+        model-<version>.pkl            pickled estimator, only for non-forest
+                                       models
+
+Loading a forest maps the arrays instead of unpickling thousands of tree
+objects, so it is near-instant and only touches the pages it uses.
+
+Saving is atomic: data files get a fresh version suffix and are renamed into
+place before the manifest that references them is swapped in with
+os.replace(). A reader therefore sees either the complete old model or the
+complete new one, never a mix or a partially written file.
+"""
+
+import os
+import json
+import time
+import pickle
+import threading
+
+import numpy as np
+
+from hand_features import FEATURES_PER_HAND, FEATURE_VERSION
+from forest_predictor import FlatForest, is_forest
+
+
+MODEL_DIR = './model'
+LEGACY_MODEL_FILE = './model.p'
+
+FORMAT_NAME = 'sign-language-model'
+FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+
+# Seconds between manifest checks in ModelWatcher
+WATCH_INTERVAL = 1.0
+
+
+def class_display_name(class_id):
+    """Class '0'..'25' -> 'A'..'Z', '26'..'35' -> '0'..'9'"""
+    i = int(class_id)
+    return chr(ord('A') + i) if i < 26 else str(i - 26)
+
+
+def version_tag():
+    """Unique suffix for the data files of one saved model"""
+    return time.strftime('%Y%m%d-%H%M%S') + '-' + os.urandom(3).hex()
+
+
+def atomic_write(path, write):
+    """Call write(file) on a temporary file, then rename it to path"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_model_artifact(model, model_dir=MODEL_DIR, metrics=None, dataset_hash=None):
+    """Write a fitted model as an artifact directory; returns the manifest"""
+    os.makedirs(model_dir, exist_ok=True)
+    version = version_tag()
+    manifest = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'model_version': version,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'feature_version': FEATURE_VERSION,
+        'n_features': FEATURES_PER_HAND,
+        'classes': [str(c) for c in model.classes_],
+        'label_map': {str(c): class_display_name(c) for c in model.classes_},
+        'dataset_hash': dataset_hash,
+        'metrics': metrics or {},
+        'estimator': type(model).__name__,
+    }
+
+    if is_forest(model):
+        forest = FlatForest.from_sklearn(model)
+        manifest['kind'] = 'flat_forest'
+        manifest['max_depth'] = forest.max_depth
+        manifest['arrays'] = {}
+        for name, array in forest.arrays().items():
+            file_name = f"{name}-{version}.npy"
+            atomic_write(os.path.join(model_dir, file_name), lambda f, array=array: np.save(f, array))
+            manifest['arrays'][name] = file_name
+    else:
+        manifest['kind'] = 'pickle'
+        manifest['pickle'] = f"model-{version}.pkl"
+        atomic_write(os.path.join(model_dir, manifest['pickle']),
+                     lambda f: pickle.dump({'model': model}, f))
+
+    # Publishing the manifest switches readers to the new files in one step
+    atomic_write(os.path.join(model_dir, MANIFEST_FILE),
+                 lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8')))
+    remove_stale_files(model_dir, manifest)
+    return manifest
+
+
+def referenced_files(manifest):
+    if manifest.get('kind') == 'flat_forest':
+        return set(manifest['arrays'].values())
+    if manifest.get('kind') == 'pickle':
+        return {manifest['pickle']}
+    return set()
+
+
+def remove_stale_files(model_dir, manifest):
+    """Delete data files of previous versions
+
+    Processes that still map an old file keep their view on POSIX; where the
+    OS refuses (open mappings on Windows) the file is left for the next save.
+    """
+    keep = referenced_files(manifest)
+    for file_name in os.listdir(model_dir):
+        if file_name.endswith(('.npy', '.pkl')) and file_name not in keep:
+            try:
+                os.remove(os.path.join(model_dir, file_name))
+            except OSError:
+                pass
+
+
+def read_manifest(model_dir=MODEL_DIR):
+    """Read and validate an artifact manifest against the current feature schema"""
+    with open(os.path.join(model_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_NAME:
+        raise ValueError(f"{model_dir} is not a sign language model")
+    if manifest.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format version {manifest.get('version')} (expected {FORMAT_VERSION})")
+    if manifest.get('feature_version') != FEATURE_VERSION or manifest.get('n_features') != FEATURES_PER_HAND:
+        raise ValueError(f"Model was trained on feature version {manifest.get('feature_version')} "
+                         f"({manifest.get('n_features')} features), current version is {FEATURE_VERSION} "
+                         f"({FEATURES_PER_HAND} features). Please retrain the model.")
+    return manifest
+
+
+def load_model_artifact(model_dir=MODEL_DIR, mmap=True):
+    """Load an artifact directory; returns (predictor, manifest)"""
+    manifest = read_manifest(model_dir)
+    if manifest['kind'] == 'flat_forest':
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(model_dir, file_name), mmap_mode=mmap_mode)
+                  for name, file_name in manifest['arrays'].items()}
+        model = FlatForest.from_arrays(arrays, manifest['max_depth'])
+    elif manifest['kind'] == 'pickle':
+        with open(os.path.join(model_dir, manifest['pickle']), 'rb') as f:
+            model = pickle.load(f)['model']
+    else:
+        raise ValueError(f"Unknown model kind '{manifest['kind']}'")
+
+    if [str(c) for c in model.classes_] != manifest['classes']:
+        raise ValueError("Model classes do not match the manifest")
+    return model, manifest
+
+
+def validate_model(model, manifest):
+    """Smoke-test a freshly loaded model before it replaces the live one"""
+    prediction = model.predict(np.zeros((1, manifest['n_features']), dtype=np.float32))
+    if str(prediction[0]) not in manifest['classes']:
+        raise ValueError(f"Model predicted unknown class {prediction[0]!r}")
+
+
+def model_available(model_dir=MODEL_DIR, legacy_model=LEGACY_MODEL_FILE):
+    return os.path.exists(os.path.join(model_dir, MANIFEST_FILE)) or os.path.exists(legacy_model)
+
+
+def load_classifier(model_dir=MODEL_DIR, legacy_model=LEGACY_MODEL_FILE):
+    """Load the model for per-frame prediction
+
+    Prefers the artifact directory; falls back to the legacy model.p pickle
+    (flattened into a FlatForest when it holds a forest).
+    """
+    if os.path.exists(os.path.join(model_dir, MANIFEST_FILE)):
+        model, _ = load_model_artifact(model_dir)
+        return model
+    with open(legacy_model, 'rb') as f:
+        model = pickle.load(f)['model']
+    if is_forest(model):
+        return FlatForest.from_sklearn(model)
+    return model
+
+
+class ModelWatcher:
+    """Background thread that reloads the model when its manifest changes
+
+    The manifest is polled every `interval` seconds (check_now() triggers an
+    immediate check, e.g. when a training run finishes). A changed artifact is
+    loaded and validated on the watcher thread; only then is on_change(model,
+    manifest) called, so the caller can swap its model reference between
+    frames without ever seeing a half-loaded model. Failures are passed to
+    on_error and the current model stays in place.
+    """
+
+    def __init__(self, on_change, model_dir=MODEL_DIR, interval=WATCH_INTERVAL, on_error=None):
+        self.on_change = on_change
+        self.on_error = on_error
+        self.model_dir = model_dir
+        self.interval = interval
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+        self._signature = self.signature()
+
+    def signature(self):
+        """(mtime_ns, size, inode) of the manifest, or None if there is none"""
+        try:
+            st = os.stat(os.path.join(self.model_dir, MANIFEST_FILE))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+
+    def check_now(self):
+        self._wake.set()
+
+    def _run(self):
+        while self._running:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._running:
+                break
+            signature = self.signature()
+            if signature is None or signature == self._signature:
+                continue
+            self._signature = signature
+            try:
+                model, manifest = load_model_artifact(self.model_dir)
+                validate_model(model, manifest)
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(e)
+                continue
+            self.on_change(model, manifest)
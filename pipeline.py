@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detection Pipeline Module
+
+Author: Nayana Pabasara
+Created: 2025
+Description: Building blocks for running capture, inference and rendering as
+             separate stages. Every hand-off keeps only the newest item, so a
+             slow stage drops stale frames instead of building up latency.
+"""
+
+import os
+import csv
+import json
+import math
+import time
+import queue
+import threading
+from array import array
+from collections import deque
+
+import numpy as np
+
+
+class StageRing:
+    """Fixed-size ring buffer of one stage's durations and end times (ns)"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.durations = array('q', bytes(8 * capacity))
+        self.ends = array('q', bytes(8 * capacity))
+        self.count = 0
+
+
+class StageTimings:
+    """Per-stage latency histograms over the most recent samples
+
+    Every stage gets preallocated ring buffers of integer nanoseconds, so
+    recording a sample is two array stores and allocates nothing; percentiles
+    and rates are only computed when snapshot() is called. With
+    enabled=False record() returns immediately.
+    """
+
+    def __init__(self, capacity=512, enabled=True):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._rings = {}
+        self._started = time.perf_counter()
+
+    def _ring(self, stage):
+        with self._lock:
+            ring = self._rings.get(stage)
+            if ring is None:
+                ring = self._rings[stage] = StageRing(self.capacity)
+            return ring
+
+    def record(self, stage, seconds):
+        if self.enabled:
+            self.record_ns(stage, int(seconds * 1e9))
+
+    def record_ns(self, stage, duration_ns, end_ns=None):
+        """Record a duration in nanoseconds (end_ns defaults to now)"""
+        if not self.enabled:
+            return
+        ring = self._rings.get(stage)
+        if ring is None:
+            ring = self._ring(stage)
+        i = ring.count % ring.capacity
+        ring.durations[i] = duration_ns
+        ring.ends[i] = time.perf_counter_ns() if end_ns is None else end_ns
+        ring.count += 1
+
+    def snapshot(self):
+        """Statistics per stage over the samples in its ring buffer
+
+        'fps' is the stage's rate over the buffered samples; durations are in
+        milliseconds.
+        """
+        with self._lock:
+            rings = list(self._rings.items())
+        result = {}
+        for stage, ring in rings:
+            count = ring.count
+            n = min(count, ring.capacity)
+            if n == 0:
+                continue
+            durations = np.frombuffer(ring.durations, dtype=np.int64)[:n] / 1e6
+            ends = np.frombuffer(ring.ends, dtype=np.int64)[:n]
+            last = (count - 1) % ring.capacity
+            span_ns = int(ends.max() - ends.min())
+            p50, p95, p99 = np.percentile(durations, (50, 95, 99))
+            result[stage] = {
+                'count': count,
+                'last_ms': float(durations[last]),
+                'avg_ms': float(durations.mean()),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(durations.max()),
+                'fps': (n - 1) * 1e9 / span_ns if span_ns > 0 else 0.0,
+            }
+        return result
+
+    def summary(self):
+        """One-line human readable summary"""
+        parts = []
+        for stage, stats in self.snapshot().items():
+            parts.append(f"{stage} {stats['p50_ms']:.1f}/{stats['p95_ms']:.1f}ms ({stats['fps']:.1f}/s)")
+        return ", ".join(parts) + " (p50/p95)"
+
+
+class MetricsExporter:
+    """Appends StageTimings snapshots to a .jsonl or .csv metrics file"""
+
+    FIELDS = ['time', 'stage', 'count', 'last_ms', 'avg_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'fps']
+
+    def __init__(self, path):
+        self.path = path
+        self.csv = path.lower().endswith('.csv')
+        self._needs_header = self.csv and (not os.path.exists(path) or os.path.getsize(path) == 0)
+
+    def write(self, snapshot):
+        now = time.time()
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            if self.csv:
+                writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+                if self._needs_header:
+                    writer.writeheader()
+                    self._needs_header = False
+                for stage, stats in snapshot.items():
+                    writer.writerow(dict(stats, time=now, stage=stage))
+            else:
+                f.write(json.dumps({'time': now, 'stages': snapshot}) + '\n')
+
+
+class AdaptiveRateController:
+    """Chooses how many frames to skip between full inferences
+
+    The average processing time of a full inference (detection + classify)
+    is tracked with an exponential moving average. To keep the per-frame
+    cost within the budget (1 / target_fps, or latency_budget_ms if given),
+    inference runs on every (skip + 1)-th frame with
+
+        skip = ceil(avg_inference_time / budget) - 1, clamped to [0, max_skip]
+
+    Frames in between reuse the last landmarks and prediction.
+    """
+
+    def __init__(self, target_fps=30.0, latency_budget_ms=None, max_skip=4, alpha=0.2, window=2.0):
+        self.target_fps = target_fps
+        self.latency_budget_ms = latency_budget_ms
+        self.max_skip = max_skip
+        self.alpha = alpha
+        self.window = window
+        self.skip = 0
+        self.avg_ms = None
+        self.frames = 0
+        self.inferences = 0
+        self._countdown = 0
+        # Timestamps of recent inferences for the effective inference rate
+        self._recent = deque()
+
+    @property
+    def budget_ms(self):
+        if self.latency_budget_ms is not None:
+            return self.latency_budget_ms
+        return 1000.0 / self.target_fps
+
+    def should_infer(self):
+        """Call once per frame; True if this frame gets a full inference"""
+        self.frames += 1
+        if self._countdown > 0:
+            self._countdown -= 1
+            return False
+        self._countdown = self.skip
+        return True
+
+    def record(self, seconds):
+        """Report the processing time of a full inference"""
+        ms = seconds * 1000.0
+        if self.avg_ms is None:
+            self.avg_ms = ms
+        else:
+            self.avg_ms += self.alpha * (ms - self.avg_ms)
+        self.skip = min(self.max_skip, max(0, math.ceil(self.avg_ms / self.budget_ms) - 1))
+        self._countdown = min(self._countdown, self.skip)
+
+        now = time.perf_counter()
+        self.inferences += 1
+        self._recent.append(now)
+        while self._recent and now - self._recent[0] > self.window:
+            self._recent.popleft()
+
+    def inference_rate(self):
+        """Full inferences per second over the recent window"""
+        if len(self._recent) < 2:
+            return 0.0
+        span = self._recent[-1] - self._recent[0]
+        return (len(self._recent) - 1) / span if span > 0 else 0.0
+
+    def stats(self):
+        return {
+            'skip': self.skip,
+            'avg_inference_ms': self.avg_ms or 0.0,
+            'inference_fps': self.inference_rate(),
+            'inferred_ratio': self.inferences / self.frames if self.frames else 0.0,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"inference {stats['inference_fps']:.1f}/s "
+                f"({stats['inferred_ratio'] * 100:.0f}% of frames, skip {stats['skip']})")
+
+
+def put_latest(q, item, discard=None):
+    """Put into a bounded queue, discarding the oldest item if it is full
+
+    discard(item) is called for every item that is thrown away (e.g. to
+    return its frame buffer to a FramePool). Returns the number of discarded
+    items (0 or 1).
+    """
+    dropped = 0
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                old = q.get_nowait()
+                dropped += 1
+                if discard is not None:
+                    discard(old)
+            except queue.Empty:
+                pass
+
+
+class FramePool:
+    """Reusable frame buffers handed from stage to stage
+
+    acquire() returns a free buffer of the requested shape and only allocates
+    when every buffer of that shape is in use; the stage that finishes with a
+    frame release()s it. After warm-up the pool holds one buffer per frame in
+    flight and no pooled buffer is allocated per frame (copies made outside
+    the pool, e.g. the PIL display image, are not covered). A buffer must be
+    released exactly once.
+    """
+
+    def __init__(self, dtype=np.uint8):
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        self._free = {}
+        self.acquired = 0
+        self.allocated = 0
+        self.allocated_bytes = 0
+
+    def acquire(self, shape):
+        shape = tuple(shape)
+        with self._lock:
+            self.acquired += 1
+            free = self._free.get(shape)
+            if free:
+                return free.pop()
+        buffer = np.empty(shape, dtype=self.dtype)
+        self.track(buffer)
+        return buffer
+
+    def track(self, buffer):
+        """Count a buffer allocated outside the pool (e.g. by OpenCV) that will be released into it"""
+        with self._lock:
+            self.allocated += 1
+            self.allocated_bytes += buffer.nbytes
+
+    def release(self, buffer):
+        with self._lock:
+            self._free.setdefault(buffer.shape, []).append(buffer)
+
+    def summary(self, frames):
+        """Allocations relative to the number of frames that went through the pool
+
+        A frame may acquire several buffers (e.g. capture and RGB copy), so
+        the caller passes its own frame count.
+        """
+        return (f"{self.allocated} frame buffers ({self.allocated_bytes / 1e6:.1f} MB) allocated "
+                f"for {frames} frames ({self.acquired} acquisitions)")
+
+
+class LatestSlot:
+    """Single-slot, overwrite-on-publish buffer between a worker and the UI
+
+    The producer never blocks: publishing replaces any item the consumer has
+    not taken yet (counted in `overwritten`), so the consumer only ever sees
+    the newest item and skips the rest.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._item = None
+        self._has_item = False
+        self.overwritten = 0
+
+    def publish(self, item):
+        with self._lock:
+            if self._has_item:
+                self.overwritten += 1
+            self._item = item
+            self._has_item = True
+
+    def take(self):
+        """Return the newest item and empty the slot, or None if there is none"""
+        with self._lock:
+            if not self._has_item:
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            return item
+
+    def clear(self):
+        self.take()
+
+
+class LatestFrameGrabber:
+    """Capture thread that always holds the newest camera frame
+
+    Consumers call read() with the sequence number of the frame they last
+    processed and get the newest frame after it; frames that arrived in
+    between are skipped (and counted in `dropped`). `frame_time_ns` is the
+    perf_counter_ns() capture time of the frame read() returned last.
+
+    With a FramePool, frames are read into pooled buffers; a frame returned
+    by read() belongs to the consumer, which releases it to the pool, and
+    skipped frames are released by the grabber.
+    """
+
+    def __init__(self, cap, timings=None, pool=None):
+        self.cap = cap
+        self.timings = timings
+        self.pool = pool
+        self._shape = None
+        self.dropped = 0
+        self.failed = False
+        self._frame = None
+        self._frame_ns = 0
+        self.frame_time_ns = 0
+        self._seq = 0
+        self._consumed_seq = 0
+        self._running = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while self._running:
+            # The frame size is only known once the first frame arrived
+            buffer = self.pool.acquire(self._shape) if self.pool is not None and self._shape else None
+            start = time.perf_counter_ns()
+            ret, frame = self.cap.read(buffer) if buffer is not None else self.cap.read()
+            end = time.perf_counter_ns()
+            if self.pool is not None and ret and frame is not buffer:
+                # First frame or a size change: OpenCV allocated the frame
+                if buffer is not None:
+                    self.pool.release(buffer)
+                self.pool.track(frame)
+                self._shape = frame.shape
+            if not ret:
+                with self._cond:
+                    self.failed = True
+                    self._running = False
+                    self._cond.notify_all()
+                break
+            if self.timings is not None:
+                self.timings.record_ns('capture', end - start, end)
+            with self._cond:
+                if self._seq > self._consumed_seq:
+                    # Previous frame was never picked up
+                    self.dropped += 1
+                    if self.pool is not None:
+                        self.pool.release(self._frame)
+                self._frame = frame
+                self._frame_ns = end
+                self._seq += 1
+                self._cond.notify_all()
+
+    def read(self, last_seq=0, timeout=None):
+        """Wait for a frame newer than last_seq; returns (seq, frame) or None"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > last_seq or not self._running, timeout):
+                return None
+            if self._seq <= last_seq:
+                return None
+            self._consumed_seq = self._seq
+            self.frame_time_ns = self._frame_ns
+            return self._seq, self._frame
+
+    @property
+    def frames(self):
+        """Number of frames captured so far"""
+        return self._seq
+
+    @property
+    def running(self):
+        return self._running
+
+    def stop(self, timeout=1.0):
+        """Stop the capture thread (the caller still owns and releases cap)"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
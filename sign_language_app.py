@@ -6,22 +6,40 @@ Sign Language Detection Application
 Author: Nayana Pabasara
 Created: 2024
 Description: Modern GUI application for sign language detection with custom styling
+
+The window is shown before any heavy work is done: OpenCV, MediaPipe and
+Pillow are imported where they are first used, and the model, the MediaPipe
+hand tracking graph and the camera are set up by a background initializer
+that reports its progress in the status panel.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import cv2
-import mediapipe as mp
-import numpy as np
-import pickle
+from tkinter import ttk, messagebox
 import threading
-import os
-from PIL import Image, ImageTk
+import queue
+import time
 import subprocess
 import sys
+import argparse
+
+import numpy as np
+
+from hand_features import HandFeatureExtractor
+from letter_decoder import LetterDecoder
+from model_store import ModelWatcher, load_classifier, model_available
+from pipeline import (AdaptiveRateController, FramePool, LatestFrameGrabber, LatestSlot, MetricsExporter,
+                      StageTimings, put_latest)
+
+
+# Stages shown in the performance panel, in pipeline order
+STAGES = ('capture', 'convert_in', 'detect', 'featurize', 'classify', 'draw', 'convert', 'display', 'latency')
+# Size of the video shown in the window
+DISPLAY_WIDTH = 640
+DISPLAY_HEIGHT = 480
 
 class SignLanguageApp:
-    def __init__(self, root):
+    def __init__(self, root, profiling=True, overlay=False, metrics_file=None, capture_size=(DISPLAY_WIDTH, DISPLAY_HEIGHT),
+                 capture_fps=30, capture_fourcc='MJPG'):
         self.root = root
         self.root.title("Sign Language Detector - By Nayana Pabasara")
         self.root.geometry("1000x700")
@@ -34,28 +52,89 @@ class SignLanguageApp:
         
         # Variables
         self.cap = None
+        # Requested camera mode; capturing at the display size avoids a
+        # resize per frame. Frames are read, mirrored and converted into
+        # buffers from frame_pool and returned to it after display.
+        self.capture_size = capture_size
+        self.capture_fps = capture_fps
+        self.capture_fourcc = capture_fourcc
+        self.frame_pool = None
+        # Cleared when another process needs the camera (Collect Data), so
+        # the initializer does not keep it open
+        self.keep_camera = True
+        self.grabber = None
+        self.timings = None
         self.is_detecting = False
+        # Each detection run gets its own stop event, grabber, render queue
+        # and pool, handed to its threads; stop_detection joins the threads
+        # so a quick Stop -> Start never has two runs sharing the hand tracker
+        self.stop_event = None
+        self.detection_thread = None
+        self.render_thread = None
         self.model = None
-        # Create labels dictionary for A-Z (26 letters) + 0-9 (10 numbers) = 36 total
-        self.labels_dict = {}
-        # Add letters A-Z (classes 0-25)
-        for i in range(26):
-            self.labels_dict[i] = chr(ord('A') + i)
-        # Add numbers 0-9 (classes 26-35)
-        for i in range(10):
-            self.labels_dict[i + 26] = str(i)
-        
-        # MediaPipe setup
-        self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
-        self.hands = self.mp_hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.3, min_tracking_confidence=0.3)
-        # Custom drawing specs for sharper and thicker landmark lines
-        self.landmark_spec = self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=3)
-        self.connection_spec = self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=1)
+        # Set by the background initializer once the model, hand tracker and
+        # camera are ready (or have failed)
+        self.initializing = False
+        self.ready = threading.Event()
+        # Start Detection was pressed while still initializing
+        self.start_pending = False
+        
+        # MediaPipe setup (the graph is built by the background initializer)
+        self.mp_hands = None
+        self.mp_drawing = None
+        self.hands = None
+        # Video mode tracks the hand between frames instead of running palm
+        # detection on every frame; use 'static' to detect on every frame
+        self.tracking_mode = 'video'
+        self.min_tracking_confidence = 0.5
+        # ROI cropping around the previous hand box (replaces video tracking,
+        # most useful with high-resolution cameras)
+        self.roi_crop = False
+        self.feature_extractor = HandFeatureExtractor(max_hands=1)
+        self.landmark_spec = None
+        self.connection_spec = None
+        
+        # Worker threads never touch Tk widgets: they publish the newest
+        # rendered frame into display_slot and log messages into
+        # status_queue, and poll_ui applies them on the Tk thread
+        self.display_slot = LatestSlot()
+        self.status_queue = queue.Queue()
+        self.display_interval_ms = 16  # ~60 Hz display refresh
         
+        # Adaptive detection rate: skip up to max_frame_skip frames between
+        # full inferences to keep up with target_fps on slower machines
+        self.target_fps = 30
+        self.max_frame_skip = 4
+        self.rate_controller = None
+        
+        # Letter stream: per-frame probabilities are smoothed ('ema' or
+        # 'vote') and a letter is committed after being held letter_hold_ms
+        self.smoothing_method = 'ema'
+        self.letter_hold_ms = 600
+        self.decoder = None
+        self.last_character = None
+        self.shown_result = None
+        
+        # Per-stage timings: ring-buffer histograms recorded on the hot path,
+        # summarized once per stats_interval for the stats panel, the
+        # optional on-frame overlay and the metrics file (.jsonl or .csv)
+        self.profiling = profiling
+        self.metrics_file = metrics_file
+        self.metrics = None
+        self.stats_interval = 1.0
+        self.next_stats = 0.0
+        self.overlay_lines = ()
+        self.show_overlay = overlay
+        
+        # Hot reload: a retrained model (from the Train button or a
+        # train_classifier.py run in a terminal) is loaded and validated in
+        # the background and swapped in while detection keeps running
+        self.model_watcher = ModelWatcher(self.on_model_reloaded, on_error=self.on_model_reload_error)
+        
+        self.overlay_var = tk.BooleanVar(value=overlay)
         self.setup_ui()
-        self.load_model()
+        self.initialize_async()
+        self.root.after(self.display_interval_ms, self.poll_ui)
         
     def configure_styles(self):
         """Configure custom styles for the application"""
@@ -120,6 +199,16 @@ class SignLanguageApp:
                                   command=self.train_model, style='Custom.TButton')
         self.train_btn.pack(side=tk.LEFT, padx=10)
         
+        self.clear_btn = ttk.Button(button_frame, text="Clear Text", 
+                                  command=self.clear_text, style='Custom.TButton')
+        self.clear_btn.pack(side=tk.LEFT, padx=10)
+        
+        overlay_check = tk.Checkbutton(control_frame, text="Performance overlay", variable=self.overlay_var,
+                                       command=self.toggle_overlay,
+                                       bg='#34495e', fg='#ecf0f1', selectcolor='#2c3e50',
+                                       activebackground='#34495e', activeforeground='#ecf0f1')
+        overlay_check.pack(pady=(0, 10))
+        
         # Status frame
         status_frame = tk.Frame(main_frame, bg='#34495e', relief=tk.RAISED, bd=2)
         status_frame.pack(fill=tk.X, pady=(0, 20))
@@ -131,6 +220,11 @@ class SignLanguageApp:
                                  font=('Consolas', 10), wrap=tk.WORD)
         self.status_text.pack(fill=tk.X, padx=10, pady=(0, 10))
         
+        # Performance panel: per-stage p50/p95/max latency and rate
+        self.stats_label = tk.Label(status_frame, bg='#2c3e50', fg='#2ecc71', font=('Consolas', 9),
+                                    justify=tk.LEFT, anchor='w', text="Performance: not running")
+        self.stats_label.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
         # Video frame
         video_frame = tk.Frame(main_frame, bg='#34495e', relief=tk.RAISED, bd=2)
         video_frame.pack(fill=tk.BOTH, expand=True)
@@ -153,74 +247,393 @@ class SignLanguageApp:
         self.result_text.pack(fill=tk.X, padx=10, pady=(0, 10))
         
     def log_status(self, message):
-        """Log status messages"""
-        self.status_text.insert(tk.END, f"{message}\n")
-        self.status_text.see(tk.END)
-        self.root.update()
+        """Log status messages (safe to call from any thread)"""
+        if threading.current_thread() is threading.main_thread():
+            self.status_text.insert(tk.END, f"{message}\n")
+            self.status_text.see(tk.END)
+        else:
+            # Tk widgets may only be touched from the main thread; the
+            # message is picked up by poll_ui
+            self.status_queue.put(message)
+            
+    def poll_ui(self):
+        """Tk-side scheduler: pull the newest frame/result and queued log messages"""
+        while True:
+            try:
+                message = self.status_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.log_status(message)
+        
+        item = self.display_slot.take()
+        if item is not None and self.is_detecting:
+            from PIL import ImageTk
+            image, predicted_character, captured = item
+            start = time.perf_counter_ns()
+            photo = ImageTk.PhotoImage(image=image)
+            self.video_label.config(image=photo)
+            self.video_label.image = photo
+            shown = time.perf_counter_ns()
+            self.timings.record_ns('display', shown - start, shown)
+            # End-to-end: camera read returned -> frame on screen
+            self.timings.record_ns('latency', shown - captured, shown)
+            if predicted_character is not None:
+                self.last_character = predicted_character
+            self.show_result()
+        
+        if self.start_pending and self.ready.is_set():
+            self.start_pending = False
+            self.start_btn.config(state=tk.NORMAL)
+            self.start_detection()
+        
+        if self.is_detecting and self.timings.enabled and time.perf_counter() >= self.next_stats:
+            self.next_stats = time.perf_counter() + self.stats_interval
+            self.update_stats()
+        
+        self.root.after(self.display_interval_ms, self.poll_ui)
+        
+    def toggle_overlay(self):
+        # Mirrored into a plain attribute: the render thread must not read Tk variables
+        self.show_overlay = self.overlay_var.get()
+        
+    def update_stats(self):
+        """Summarize the stage timings into the panel, the overlay and the metrics file"""
+        snapshot = self.timings.snapshot()
+        if not snapshot:
+            return
+        lines = [f"{'stage':<10}{'p50':>8}{'p95':>8}{'max':>8}{'rate':>9}"]
+        for stage in STAGES:
+            stats = snapshot.get(stage)
+            if stats is not None:
+                lines.append(f"{stage:<10}{stats['p50_ms']:>6.1f}ms{stats['p95_ms']:>6.1f}ms"
+                             f"{stats['max_ms']:>6.1f}ms{stats['fps']:>7.1f}/s")
+        self.stats_label.config(text="\n".join(lines))
+        
+        display = snapshot.get('display', {})
+        latency = snapshot.get('latency', {})
+        detect = snapshot.get('detect', {})
+        # Replaced as a whole so the render thread always reads a consistent tuple
+        self.overlay_lines = (
+            f"FPS {display.get('fps', 0.0):.1f}  latency {latency.get('p50_ms', 0.0):.0f}/"
+            f"{latency.get('p95_ms', 0.0):.0f}ms",
+            f"detect {detect.get('p50_ms', 0.0):.1f}ms  inference {detect.get('fps', 0.0):.1f}/s",
+        )
+        if self.metrics is not None:
+            self.metrics.write(snapshot)
+        
+    def show_result(self):
+        """Show the current (smoothed) letter and the committed text"""
+        text = self.decoder.text if self.decoder is not None else ''
+        result = (self.last_character, text)
+        if result == self.shown_result:
+            return
+        self.shown_result = result
+        self.result_text.delete(1.0, tk.END)
+        if self.last_character is not None:
+            self.result_text.insert(tk.END, f"Detected: {self.last_character}\n")
+        self.result_text.insert(tk.END, f"Text: {text}")
+        
+    def clear_text(self):
+        """Clear the committed letter stream"""
+        if self.decoder is not None:
+            self.decoder.clear()
+            self.show_result()
         
     def load_model(self):
-        """Load the trained model"""
+        """Load the trained model (memory-mapped artifact when available); returns True on success"""
         try:
-            if os.path.exists('model.p'):
-                model_dict = pickle.load(open('model.p', 'rb'))
-                self.model = model_dict['model']
-                self.log_status("✓ Model loaded successfully")
-            else:
-                self.log_status("⚠ No trained model found. Please train a model first.")
+            if model_available():
+                start = time.perf_counter()
+                self.model = load_classifier()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self.log_status(f"✓ Model loaded successfully ({elapsed_ms:.0f} ms)")
+                return True
+            self.log_status("⚠ No trained model found. Please train a model first.")
         except Exception as e:
             self.log_status(f"✗ Error loading model: {str(e)}")
+        return False
+            
+    def load_hand_tracker(self):
+        """Import MediaPipe and build the hand tracking graph"""
+        try:
+            start = time.perf_counter()
+            import mediapipe as mp
+            from hand_tracker import HandTracker
+            self.mp_hands = mp.solutions.hands
+            self.mp_drawing = mp.solutions.drawing_utils
+            # Custom drawing specs for sharper and thicker landmark lines
+            self.landmark_spec = self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=3)
+            self.connection_spec = self.mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=1)
+            self.hands = HandTracker(mode='static' if self.roi_crop else self.tracking_mode, max_num_hands=1,
+                                     min_detection_confidence=0.3,
+                                     min_tracking_confidence=self.min_tracking_confidence, roi=self.roi_crop)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.log_status(f"✓ Hand tracker ready ({elapsed_ms:.0f} ms)")
+            return True
+        except Exception as e:
+            self.log_status(f"✗ Error loading hand tracker: {str(e)}")
+            return False
+            
+    def open_camera(self):
+        """Open the camera ahead of time so Start Detection does not wait for it"""
+        from camera import capture_settings, describe_settings
+        start = time.perf_counter()
+        cap = self.create_capture()
+        if cap.isOpened() and not self.keep_camera:
+            # Collect Data was opened meanwhile and needs the device
+            cap.release()
+            self.log_status("✓ Camera available (released for data collection)")
+            return True
+        if cap.isOpened():
+            self.cap = cap
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.log_status(f"✓ Camera ready: {describe_settings(capture_settings(cap))} ({elapsed_ms:.0f} ms)")
+            return True
+        cap.release()
+        self.log_status("⚠ Could not open camera")
+        return False
+            
+    def create_capture(self):
+        from camera import open_camera
+        width, height = self.capture_size
+        return open_camera(0, width, height, self.capture_fps, self.capture_fourcc)
+            
+    def initialize(self):
+        """Background initializer: model, hand tracking graph and camera
+
+        Every step runs even if an earlier one failed; "Ready" is only
+        reported when all of them succeeded.
+        """
+        start = time.perf_counter()
+        steps = [("Loading model", self.load_model),
+                 ("Building hand tracking graph", self.load_hand_tracker),
+                 ("Opening camera", self.open_camera)]
+        failed = 0
+        try:
+            for i, (description, step) in enumerate(steps, 1):
+                self.log_status(f"[{i}/{len(steps)}] {description}...")
+                if not step():
+                    failed += 1
+        except Exception as e:
+            failed += 1
+            self.log_status(f"✗ Initialization error: {str(e)}")
+        finally:
+            self.initializing = False
+            self.ready.set()
+        if failed:
+            self.log_status(f"⚠ Started with {failed} problem(s), see above")
+        else:
+            self.log_status(f"✓ Ready ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        self.model_watcher.start()
+            
+    def initialize_async(self):
+        """Run the initializer on a background thread so the window appears immediately"""
+        self.initializing = True
+        threading.Thread(target=self.initialize, daemon=True).start()
+            
+    def on_model_reloaded(self, model, manifest):
+        """Called on the watcher thread with a loaded and validated model"""
+        # A single reference assignment: the detection thread picks up the
+        # new model on its next frame, without locking or pausing
+        self.model = model
+        accuracy = manifest.get('metrics', {}).get('accuracy')
+        details = f", accuracy {accuracy * 100:.1f}%" if accuracy is not None else ""
+        self.log_status(f"✓ Model reloaded ({manifest['estimator']}{details})")
+        
+    def on_model_reload_error(self, error):
+        self.log_status(f"⚠ New model could not be loaded, keeping the current one: {str(error)}")
             
     def start_detection(self):
         """Start real-time detection"""
+        if self.initializing:
+            # poll_ui starts detection as soon as the initializer has finished
+            if not self.start_pending:
+                self.start_pending = True
+                self.start_btn.config(state=tk.DISABLED)
+                self.log_status("Detection will start when initialization has finished...")
+            return
         if self.model is None:
             messagebox.showerror("Error", "No trained model found. Please train a model first.")
             return
+        if self.hands is None:
+            messagebox.showerror("Error", "Hand tracking is not available, see the status panel.")
+            return
             
         try:
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
-                messagebox.showerror("Error", "Could not open camera")
+            # A previous run whose threads did not finish in time must not
+            # overlap with this one
+            if not self.join_workers():
+                self.log_status("⚠ Previous detection run is still stopping, try again")
                 return
+            if self.cap is None or not self.cap.isOpened():
+                self.cap = self.create_capture()
+                if not self.cap.isOpened():
+                    messagebox.showerror("Error", "Could not open camera")
+                    return
                 
             self.is_detecting = True
             self.start_btn.config(state=tk.DISABLED)
             self.stop_btn.config(state=tk.NORMAL)
             
+            # Capture -> inference -> render stages; each hand-off keeps only
+            # the newest frame so a slow stage never queues up stale frames
+            self.timings = StageTimings(enabled=self.profiling)
+            self.metrics = MetricsExporter(self.metrics_file) if self.metrics_file and self.profiling else None
+            self.next_stats = time.perf_counter() + self.stats_interval
+            self.overlay_lines = ()
+            self.stats_label.config(text="Performance: collecting..." if self.profiling
+                                    else "Performance: profiling disabled")
+            self.stop_event = threading.Event()
+            self.frame_pool = FramePool()
+            self.grabber = LatestFrameGrabber(self.cap, self.timings, self.frame_pool).start()
+            render_queue = queue.Queue(maxsize=1)
+            self.render_dropped = 0
+            self.display_slot.clear()
+            self.display_slot.overwritten = 0
+            self.rate_controller = AdaptiveRateController(target_fps=self.target_fps,
+                                                          max_skip=self.max_frame_skip)
+            if self.decoder is None:
+                self.decoder = LetterDecoder(self.model.classes_, method=self.smoothing_method,
+                                             hold_ms=self.letter_hold_ms)
+            
             self.log_status("✓ Detection started")
-            self.detection_thread = threading.Thread(target=self.detection_loop)
+            self.detection_thread = threading.Thread(
+                target=self.detection_loop,
+                args=(self.grabber, render_queue, self.frame_pool, self.timings, self.stop_event))
             self.detection_thread.daemon = True
             self.detection_thread.start()
+            self.render_thread = threading.Thread(
+                target=self.render_loop, args=(render_queue, self.frame_pool, self.timings, self.stop_event))
+            self.render_thread.daemon = True
+            self.render_thread.start()
             
         except Exception as e:
             self.log_status(f"✗ Error starting detection: {str(e)}")
             
+    def join_workers(self, timeout=2.0):
+        """Wait for the detection and render threads of the last run; False if one is still running"""
+        for thread in (self.detection_thread, self.render_thread):
+            if thread is not None:
+                thread.join(timeout)
+        return not any(thread is not None and thread.is_alive()
+                       for thread in (self.detection_thread, self.render_thread))
+        
     def stop_detection(self):
         """Stop real-time detection"""
         self.is_detecting = False
+        if self.stop_event is not None:
+            self.stop_event.set()
+        if self.grabber:
+            self.grabber.stop()
+        if not self.join_workers():
+            self.log_status("⚠ Detection threads did not stop in time")
         if self.cap:
             self.cap.release()
+            self.cap = None
         self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
+        self.display_slot.clear()
         self.video_label.config(image='', text="Camera stopped")
         self.log_status("✓ Detection stopped")
+        if self.timings:
+            dropped = self.grabber.dropped + self.render_dropped + self.display_slot.overwritten
+            if self.timings.enabled:
+                self.update_stats()
+                self.log_status(f"Stage timings: {self.timings.summary()}; {dropped} stale frames dropped")
+                if self.metrics is not None:
+                    self.log_status(f"✓ Metrics written to {self.metrics.path}")
+            self.log_status(f"Adaptive rate: {self.rate_controller.summary()}")
+            self.log_status(f"Frame path: {self.frame_pool.summary(self.grabber.frames)}")
+        
+    def detection_loop(self, grabber, render_queue, frame_pool, timings, stop):
+        """Inference stage: detect hands and classify the newest captured frame"""
+        from camera import mirror_to_rgb
+        
+        def release_render_item(item):
+            # Frame of a render item dropped from the queue goes back to the pool
+            frame_pool.release(item[0])
         
-    def detection_loop(self):
-        """Main detection loop"""
-        while self.is_detecting:
+        seq = 0
+        # Landmarks and prediction of the last full inference, reused on
+        # frames the rate controller skips
+        multi_hand_landmarks = None
+        detection = None
+        decoder_model = None
+        while not stop.is_set():
             try:
-                ret, frame = self.cap.read()
-                if not ret:
-                    break
+                item = grabber.read(seq, timeout=0.5)
+                if item is None:
+                    if not grabber.running:
+                        break
+                    continue
+                seq, captured_frame = item
+                captured = grabber.frame_time_ns
+                
+                mirror_start = time.perf_counter_ns()
+                # Mirror and convert to RGB in one pooled buffer; the frame
+                # stays RGB through detection, drawing and display
+                frame = mirror_to_rgb(captured_frame, frame_pool.acquire(captured_frame.shape))
+                frame_pool.release(captured_frame)
+                start_ns = time.perf_counter_ns()
+                start = start_ns * 1e-9
+                timings.record_ns('convert_in', start_ns - mirror_start, start_ns)
+                
+                if self.rate_controller.should_infer():
+                    results = self.hands.process(frame)
+                    detected = time.perf_counter_ns()
+                    timings.record_ns('detect', detected - start_ns, detected)
                     
-                # Flip frame horizontally
-                frame = cv2.flip(frame, 1)
-                H, W, _ = frame.shape
+                    multi_hand_landmarks = results.multi_hand_landmarks
+                    detection = None
+                    if multi_hand_landmarks:
+                        # Extract features and predict
+                        features = self.feature_extractor.extract(multi_hand_landmarks)
+                        bounds = self.feature_extractor.bounds()
+                        featurized = time.perf_counter_ns()
+                        timings.record_ns('featurize', featurized - detected, featurized)
+                        
+                        # Read the reference once so a hot reload never
+                        # switches models in the middle of a frame
+                        model = self.model
+                        if decoder_model is not model:
+                            self.decoder.set_classes(model.classes_)
+                            decoder_model = model
+                        proba = model.predict_proba(features.reshape(1, -1))[0]
+                        # Show the smoothed letter instead of the raw per-frame winner
+                        self.decoder.update(proba, start)
+                        predicted_character, _ = self.decoder.current()
+                        detection = (predicted_character, bounds)
+                        classified = time.perf_counter_ns()
+                        timings.record_ns('classify', classified - featurized, classified)
+                    else:
+                        self.decoder.update(None, start)
+                    self.rate_controller.record((time.perf_counter_ns() - start_ns) * 1e-9)
                 
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.hands.process(frame_rgb)
+                self.render_dropped += put_latest(render_queue,
+                                                  (frame, multi_hand_landmarks, detection, captured),
+                                                  discard=release_render_item)
                 
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
+            except Exception as e:
+                self.log_status(f"✗ Detection error: {str(e)}")
+                break
+                
+    def render_loop(self, render_queue, frame_pool, timings, stop):
+        """Render stage: draw landmarks and prediction, publish the frame for display"""
+        import cv2
+        from PIL import Image
+        # Only used when the camera did not agree to the display size
+        display_buffer = None
+        while not stop.is_set():
+            try:
+                try:
+                    frame, multi_hand_landmarks, detection, captured = render_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                
+                start = time.perf_counter_ns()
+                H, W, _ = frame.shape
+                if multi_hand_landmarks:
+                    for hand_landmarks in multi_hand_landmarks:
                         self.mp_drawing.draw_landmarks(
                             frame,
                             hand_landmarks,
@@ -228,33 +641,15 @@ class SignLanguageApp:
                             self.landmark_spec,
                             self.connection_spec
                         )
-                    
-                    # Extract features and predict
-                    data_aux = []
-                    x_ = []
-                    y_ = []
-                    
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        for i in range(len(hand_landmarks.landmark)):
-                            x = hand_landmarks.landmark[i].x
-                            y = hand_landmarks.landmark[i].y
-                            x_.append(x)
-                            y_.append(y)
-                        
-                        for i in range(len(hand_landmarks.landmark)):
-                            x = hand_landmarks.landmark[i].x
-                            y = hand_landmarks.landmark[i].y
-                            data_aux.append(x - min(x_))
-                            data_aux.append(y - min(y_))
+                
+                if detection is not None:
+                    predicted_character, (min_x, min_y, max_x, max_y) = detection
                     
                     # Draw bounding box and prediction
-                    x1 = int(min(x_) * W) - 10
-                    y1 = int(min(y_) * H) - 10
-                    x2 = int(max(x_) * W) + 10
-                    y2 = int(max(y_) * H) + 10
-                    
-                    prediction = self.model.predict([np.asarray(data_aux)])
-                    predicted_character = self.labels_dict[int(prediction[0])]
+                    x1 = int(min_x * W) - 10
+                    y1 = int(min_y * H) - 10
+                    x2 = int(max_x * W) + 10
+                    y2 = int(max_y * H) + 10
                     
                     # Thicker anti-aliased bounding box for sharper edges
                     cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 8, cv2.LINE_AA)
@@ -271,26 +666,52 @@ class SignLanguageApp:
                     bg_bottom_right = (text_x + text_w + 6, text_y + 6)
                     cv2.rectangle(frame, bg_top_left, bg_bottom_right, (0, 255, 0), -1, cv2.LINE_AA)
                     cv2.putText(frame, text, (text_x, text_y), font, font_scale, (0, 0, 0), text_thickness, cv2.LINE_AA)
-                    
-                    # Update result display
-                    self.result_text.delete(1.0, tk.END)
-                    self.result_text.insert(tk.END, f"Detected: {predicted_character}")
+                else:
+                    predicted_character = None
                 
-                # Convert frame for display
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame = cv2.resize(frame, (640, 480))
-                image = Image.fromarray(frame)
-                photo = ImageTk.PhotoImage(image=image)
+                if self.show_overlay:
+                    self.draw_overlay(frame, self.overlay_lines)
+                drawn = time.perf_counter_ns()
+                timings.record_ns('draw', drawn - start, drawn)
                 
-                self.video_label.config(image=photo)
-                self.video_label.image = photo
+                # Convert frame for display; the PhotoImage itself is created
+                # on the Tk thread in poll_ui. Image.fromarray copies, so the
+                # frame buffer can go back to the pool right away
+                if frame.shape[:2] == (DISPLAY_HEIGHT, DISPLAY_WIDTH):
+                    image = Image.fromarray(frame)
+                else:
+                    if display_buffer is None:
+                        display_buffer = np.empty((DISPLAY_HEIGHT, DISPLAY_WIDTH, 3), dtype=np.uint8)
+                    image = Image.fromarray(cv2.resize(frame, (DISPLAY_WIDTH, DISPLAY_HEIGHT), dst=display_buffer))
+                frame_pool.release(frame)
+                
+                self.display_slot.publish((image, predicted_character, captured))
+                converted = time.perf_counter_ns()
+                timings.record_ns('convert', converted - drawn, converted)
                 
             except Exception as e:
-                self.log_status(f"✗ Detection error: {str(e)}")
+                self.log_status(f"✗ Render error: {str(e)}")
                 break
                 
+    def draw_overlay(self, frame, lines):
+        """Draw the performance summary in the top-left corner of the frame"""
+        import cv2
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        for i, line in enumerate(lines):
+            y = 28 + i * 26
+            cv2.putText(frame, line, (10, y), font, 0.7, (0, 0, 0), 4, cv2.LINE_AA)
+            # Frames are RGB at this point: yellow
+            cv2.putText(frame, line, (10, y), font, 0.7, (255, 255, 0), 2, cv2.LINE_AA)
+        
     def open_data_collection(self):
         """Open data collection script with interactive menu"""
+        # collect_imgs.py opens the same camera; most drivers refuse a second
+        # opener, so give it up unless detection is running
+        if not self.is_detecting:
+            self.keep_camera = False
+            if self.cap is not None:
+                self.cap.release()
+                self.cap = None
         try:
             subprocess.Popen([sys.executable, 'collect_imgs.py'])
             self.log_status("✓ Data collection menu opened - Choose Letters, Numbers, or All")
@@ -311,22 +732,42 @@ class SignLanguageApp:
                 subprocess.run([sys.executable, 'train_classifier.py'], check=True)
                 self.log_status("✓ Model training completed")
                 
-                # Reload model
-                self.load_model()
+                # Pick up the new model right away (detection keeps running)
+                self.model_watcher.check_now()
                 
             except Exception as e:
                 self.log_status(f"✗ Training error: {str(e)}")
                 
         threading.Thread(target=train, daemon=True).start()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sign language detector GUI")
+    parser.add_argument('--overlay', action='store_true', help="Start with the FPS/latency overlay on the video")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="Append per-stage timing snapshots to FILE (.jsonl, or .csv) while detecting")
+    parser.add_argument('--camera-size', default=f"{DISPLAY_WIDTH}x{DISPLAY_HEIGHT}",
+                        help="Requested camera resolution WIDTHxHEIGHT (the driver may pick the nearest mode)")
+    parser.add_argument('--camera-fps', type=int, default=30, help="Requested camera frame rate")
+    parser.add_argument('--camera-fourcc', default='MJPG', help="Requested camera pixel format ('' = driver default)")
+    parser.add_argument('--no-profiling', action='store_true',
+                        help="Disable the per-stage timers (stats panel, overlay and metrics stay empty)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     root = tk.Tk()
-    app = SignLanguageApp(root)
+    width, height = (int(v) for v in args.camera_size.lower().split('x'))
+    app = SignLanguageApp(root, profiling=not args.no_profiling, overlay=args.overlay,
+                          metrics_file=args.metrics, capture_size=(width, height), capture_fps=args.camera_fps,
+                          capture_fourcc=args.camera_fourcc)
     
     # Handle window closing
     def on_closing():
         if app.is_detecting:
             app.stop_detection()
+        elif app.cap:
+            app.cap.release()
+        app.model_watcher.stop()
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
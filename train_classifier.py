@@ -8,31 +8,254 @@ Created: 2024
 Description: Trains machine learning model for sign language recognition
 """
 
+import os
+import time
 import pickle
+import argparse
+import tempfile
 
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
+from joblib import Parallel, delayed
 import numpy as np
 
+from dataset_store import load_training_data, dataset_hash
+from forest_predictor import FlatForest, is_forest
+from landmark_augmentation import augment_features
+from model_store import MODEL_DIR, atomic_write, load_model_artifact, save_model_artifact
 
-data_dict = pickle.load(open('./data.pickle', 'rb'))
 
-data = np.asarray(data_dict['data'])
-labels = np.asarray(data_dict['labels'])
+MODEL_FILE = 'model.p'
+# Default per-sample prediction budget for --search
+LATENCY_BUDGET_MS = 0.5
+# Share of the training split held out to rank --search candidates
+VALIDATION_SIZE = 0.2
 
-x_train, x_test, y_train, y_test = train_test_split(data, labels, test_size=0.2, shuffle=True, stratify=labels)
 
-model = RandomForestClassifier()
+def candidate_models():
+    """(name, estimator) pairs swept by --search"""
+    candidates = []
+    for n_estimators in (25, 50, 100):
+        for max_depth in (None, 12, 20):
+            for min_samples_leaf in (1, 2, 4):
+                name = f"RandomForest(n={n_estimators}, depth={max_depth}, leaf={min_samples_leaf})"
+                candidates.append((name, RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                                                min_samples_leaf=min_samples_leaf)))
+    for n_estimators in (50, 100):
+        for max_depth in (None, 16):
+            name = f"ExtraTrees(n={n_estimators}, depth={max_depth})"
+            candidates.append((name, ExtraTreesClassifier(n_estimators=n_estimators, max_depth=max_depth)))
+    for k in (1, 3, 5):
+        candidates.append((f"KNeighbors(k={k})", KNeighborsClassifier(n_neighbors=k)))
+    candidates.append(("LogisticRegression", make_pipeline(StandardScaler(), LogisticRegression(max_iter=2000))))
+    return candidates
 
-model.fit(x_train, y_train)
 
-y_predict = model.predict(x_test)
+def fit_candidate(name, model, x_train, y_train, x_val, y_val):
+    start = time.perf_counter()
+    model.fit(x_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    accuracy = accuracy_score(model.predict(x_val), y_val)
+    return {'name': name, 'model': model, 'accuracy': accuracy, 'fit_s': fit_seconds}
 
-score = accuracy_score(y_predict, y_test)
 
-print('{}% of samples were classified correctly !'.format(score * 100))
+def serving_predictor(model):
+    """The predictor the app would use for this model"""
+    return FlatForest.from_sklearn(model) if is_forest(model) else model
 
-f = open('model.p', 'wb')
-pickle.dump({'model': model}, f)
-f.close()
+
+def measure_candidate(result, x_val, repeats=200):
+    """Add artifact size, load time and single-sample predict latency
+
+    Size and load time are those of the model/ artifact the app loads
+    (manifest plus memory-mapped forest arrays, or a pickle for other
+    models), not of the pickled sklearn estimator.
+    """
+    with tempfile.TemporaryDirectory() as model_dir:
+        save_model_artifact(result['model'], model_dir)
+        result['size_kb'] = sum(os.path.getsize(os.path.join(model_dir, name))
+                                for name in os.listdir(model_dir)) / 1024
+        start = time.perf_counter()
+        load_model_artifact(model_dir)
+        result['load_ms'] = (time.perf_counter() - start) * 1000
+
+    predictor = serving_predictor(result['model'])
+    rows = [x_val[i % len(x_val)].reshape(1, -1) for i in range(repeats)]
+    predictor.predict(rows[0])
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        predictor.predict(row)
+        times.append(time.perf_counter() - start)
+    result['predict_ms'] = float(np.median(times)) * 1000
+    return result
+
+
+def pareto_front(results):
+    """Candidates not beaten on accuracy, latency and size at the same time"""
+    front = []
+    for r in results:
+        dominated = any(
+            o['accuracy'] >= r['accuracy'] and o['predict_ms'] <= r['predict_ms'] and o['size_kb'] <= r['size_kb']
+            and (o['accuracy'] > r['accuracy'] or o['predict_ms'] < r['predict_ms'] or o['size_kb'] < r['size_kb'])
+            for o in results)
+        if not dominated:
+            front.append(r)
+    return front
+
+
+def select_model(results, latency_budget_ms):
+    """Most accurate Pareto-optimal model within the latency budget
+
+    Ties are broken by lower latency, then smaller size. If nothing fits the
+    budget the fastest model is returned.
+    """
+    front = pareto_front(results)
+    within = [r for r in front if r['predict_ms'] <= latency_budget_ms]
+    if not within:
+        return min(front, key=lambda r: r['predict_ms'])
+    return max(within, key=lambda r: (r['accuracy'], -r['predict_ms'], -r['size_kb']))
+
+
+def search(x_train, x_val, y_train, y_val, latency_budget_ms=LATENCY_BUDGET_MS, n_jobs=-1):
+    """Sweep candidate models and pick one under the latency budget
+
+    Candidates are ranked on a validation split of the training data; the
+    test split is only used to score the selected model afterwards.
+    """
+    candidates = candidate_models()
+    print(f"Training {len(candidates)} candidates...")
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(fit_candidate)(name, model, x_train, y_train, x_val, y_val) for name, model in candidates)
+    # Timings are taken serially so candidates do not compete for the CPU
+    for result in results:
+        measure_candidate(result, x_val)
+
+    front = pareto_front(results)
+    best = select_model(results, latency_budget_ms)
+    print(f"{'model':<48}{'val acc':>9}{'predict':>11}{'load':>10}{'size':>11}{'fit':>8}")
+    for r in sorted(results, key=lambda r: -r['accuracy']):
+        marker = '*' if r is best else ('+' if r in front else ' ')
+        print(f"{marker}{r['name']:<47}{r['accuracy'] * 100:>8.1f}%{r['predict_ms'] * 1000:>9.0f}us"
+              f"{r['load_ms']:>8.1f}ms{r['size_kb']:>9.0f}KB{r['fit_s']:>7.1f}s")
+    print(f"+ Pareto-optimal, * selected (latency budget {latency_budget_ms}ms)")
+    return best
+
+
+def augment_training_set(x_train, y_train, copies, seed=0):
+    """Add `copies` augmented versions of every training sample (the test split stays untouched)"""
+    start = time.perf_counter()
+    x_augmented, y_augmented = augment_features(x_train, y_train, copies, seed=seed)
+    elapsed = time.perf_counter() - start
+    added = len(x_augmented) - len(x_train)
+    print(f"Augmented {added} samples in {elapsed * 1000:.0f}ms ({added / max(elapsed, 1e-9):.0f} samples/s)")
+    return x_augmented, y_augmented
+
+
+def augmentation_report(x_train, x_test, y_train, y_test, copies_list, seed=0):
+    """Accuracy gained per extra second of training for different amounts of augmentation
+
+    The same random forest is trained on the original training split and on
+    the split grown by each number of copies; accuracy is always measured on
+    the original test split.
+    """
+    results = []
+    for copies in sorted({0, *copies_list}):
+        start = time.perf_counter()
+        x_augmented, y_augmented = augment_features(x_train, y_train, copies, seed=seed)
+        model = RandomForestClassifier(random_state=seed)
+        model.fit(x_augmented, y_augmented)
+        train_seconds = time.perf_counter() - start
+        accuracy = accuracy_score(model.predict(x_test), y_test)
+        results.append({'copies': copies, 'samples': len(y_augmented), 'train_s': train_seconds,
+                        'accuracy': accuracy})
+
+    base = results[0]
+    print(f"{'copies':>6}{'samples':>10}{'train':>9}{'accuracy':>10}{'gain':>9}{'gain/extra s':>14}")
+    for r in results:
+        gain = (r['accuracy'] - base['accuracy']) * 100
+        extra = r['train_s'] - base['train_s']
+        per_second = f"{gain / extra:+.2f}pt/s" if r is not base and extra > 0 else '-'
+        print(f"{r['copies']:>6}{r['samples']:>10}{r['train_s']:>8.1f}s{r['accuracy'] * 100:>9.1f}%"
+              f"{gain:>+7.1f}pt{per_second:>14}")
+    return results
+
+
+def save_model(model, metrics=None, data_hash=None):
+    # Write to a temporary file and rename, so readers never see a partial pickle
+    atomic_write(MODEL_FILE, lambda f: pickle.dump({'model': model}, f))
+
+    # Fast-loading artifact (memory-mapped forest arrays + JSON manifest)
+    save_model_artifact(model, MODEL_DIR, metrics=metrics, dataset_hash=data_hash)
+    print('Saved model artifact to {}'.format(MODEL_DIR))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the sign language classifier")
+    parser.add_argument('--search', action='store_true',
+                        help="Sweep model types/hyperparameters and pick the best model under the latency budget")
+    parser.add_argument('--latency-budget-ms', type=float, default=LATENCY_BUDGET_MS,
+                        help="Maximum per-sample prediction latency for --search")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Parallel training jobs for --search")
+    parser.add_argument('--augment', type=int, default=0, metavar='COPIES',
+                        help="Add COPIES mirrored/rotated/scaled/noisy versions of every training sample")
+    parser.add_argument('--augment-report', default=None, metavar='COPIES',
+                        help="Before training, compare accuracy and training time for e.g. '1,2,4' copies")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the augmentation")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    dataset = load_training_data()
+
+    # The classifier works on a single hand: the first 42 features of each sample
+    data = dataset.single_hand_features()
+    labels = dataset.label_strings()
+
+    x_train, x_test, y_train, y_test = train_test_split(data, labels, test_size=0.2, shuffle=True, stratify=labels)
+
+    if args.augment_report:
+        augmentation_report(x_train, x_test, y_train, y_test,
+                            [int(c) for c in args.augment_report.split(',')], args.seed)
+    if args.search:
+        # Hold out validation samples before augmenting, so no synthetic copy
+        # of a validation sample is trained on
+        x_train, x_val, y_train, y_val = train_test_split(x_train, y_train, test_size=VALIDATION_SIZE,
+                                                          shuffle=True, stratify=y_train)
+    if args.augment > 0:
+        x_train, y_train = augment_training_set(x_train, y_train, args.augment, args.seed)
+
+    if args.search:
+        best = search(x_train, x_val, y_train, y_val, args.latency_budget_ms, args.n_jobs)
+        model = best['model']
+        score = accuracy_score(model.predict(x_test), y_test)
+        metrics = {'accuracy': score, 'validation_accuracy': best['accuracy'], 'predict_ms': best['predict_ms'],
+                   'candidate': best['name'], 'validation_samples': len(y_val)}
+        print(f"Selected {best['name']}")
+    else:
+        model = RandomForestClassifier()
+
+        model.fit(x_train, y_train)
+
+        y_predict = model.predict(x_test)
+
+        score = accuracy_score(y_predict, y_test)
+        metrics = {'accuracy': score}
+
+    print('{}% of samples were classified correctly !'.format(score * 100))
+
+    metrics['train_samples'] = len(y_train)
+    metrics['augment_copies'] = args.augment
+    metrics['test_samples'] = len(y_test)
+    save_model(model, metrics, dataset_hash(dataset))
+
+
+if __name__ == "__main__":
+    main()